@@ -1,10 +1,15 @@
 import os
 import argparse
 
+import cv2
+
 from .robotics.grid_world import GridWorld
 from .robotics.astar import astar
-from .ml.q_learning import GridWorldEnv, QLearningAgent
+from .robotics.render import render_path
+from .ml.q_learning import EarlyStopping, GridWorldEnv, QLearningAgent
+from .ml.sweep import sweep_configs, run_sweep, format_results
 from .vision.color_detect import run_demo
+from .vision.tracking import ColorTracker, iter_frames
 from .security.crypto_utils import generate_key, encrypt, decrypt, sha256_hash
 
 
@@ -29,31 +34,69 @@ def cmd_plan() -> None:
     out = os.path.join(artifacts, "astar_path.txt")
     with open(out, "w", encoding="utf-8") as f:
         f.write("\n".join([f"{p[0]},{p[1]}" for p in path]))
+    img_out = os.path.join(artifacts, "astar_path.png")
+    cv2.imwrite(img_out, cv2.cvtColor(render_path(grid, path), cv2.COLOR_RGB2BGR))
     print(f"A* path length: {max(0, len(path) - 1)}")
-    print(f"Saved path to {out}")
+    print(f"Saved path to {out} and {img_out}")
 
 
 def cmd_qlearn() -> None:
     grid = sample_grid()
     env = GridWorldEnv(grid, max_steps=200, seed=123)
     agent = QLearningAgent(env, alpha=0.5, gamma=0.95, epsilon=0.1, seed=123)
-    agent.train(episodes=800, max_steps_per_episode=200)
+    agent.train(episodes=800, max_steps_per_episode=200, early_stopping=EarlyStopping(stable_path_checks=5))
     env.reset()
     path = agent.derive_greedy_path(start=grid.start, max_steps=100)
     artifacts = ensure_artifacts()
     out = os.path.join(artifacts, "qlearn_path.txt")
     with open(out, "w", encoding="utf-8") as f:
         f.write("\n".join([f"{p[0]},{p[1]}" for p in path]))
-    print(f"Q-learning path length: {max(0, len(path) - 1)}")
+    print(f"Q-learning path length: {max(0, len(path) - 1)} (trained {len(agent.history)} episodes)")
     print(f"Saved path to {out}")
 
 
+def _floats(text: str) -> list:
+    return [float(v) for v in text.split(",")]
+
+
+def _ints(text: str) -> list:
+    return [int(v) for v in text.split(",")]
+
+
+def cmd_sweep(args: argparse.Namespace) -> None:
+    grid = sample_grid()
+    configs = sweep_configs(args.alphas, args.gammas, args.epsilons, args.episodes, args.seeds)
+    results = run_sweep(grid, configs, workers=args.workers)
+    table = format_results(results)
+    artifacts = ensure_artifacts()
+    out = os.path.join(artifacts, "qlearn_sweep.csv")
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(table + "\n")
+    print(table)
+    print(f"Saved sweep results to {out}")
+
+
 def cmd_vision() -> None:
     artifacts = ensure_artifacts()
     out = run_demo(output_dir=artifacts)
     print(f"Saved color detection demo to {out}")
 
 
+def cmd_track(args: argparse.Namespace) -> None:
+    source = int(args.source) if args.source.isdigit() else args.source
+    tracker = ColorTracker(margin=args.margin, reacquire_every=args.reacquire_every)
+    artifacts = ensure_artifacts()
+    out = os.path.join(artifacts, "track_boxes.csv")
+    with open(out, "w", encoding="utf-8") as f:
+        f.write("frame,x,y,w,h\n")
+        for result in tracker.track(iter_frames(source)):
+            for x, y, w, h in result.boxes:
+                f.write(f"{result.index},{x},{y},{w},{h}\n")
+    stats = tracker.stats
+    print(f"Tracked {stats.frames} frames at {stats.fps:.1f} fps ({stats.full_frames} full-frame searches)")
+    print(f"Saved boxes to {out}")
+
+
 def cmd_crypto() -> None:
     artifacts = ensure_artifacts()
     key = generate_key()
@@ -78,7 +121,18 @@ def main() -> None:
     sub = parser.add_subparsers(dest="cmd", required=True)
     sub.add_parser("plan")
     sub.add_parser("qlearn")
+    sweep = sub.add_parser("sweep", help="parallel Q-learning hyperparameter sweep")
+    sweep.add_argument("--alphas", type=_floats, default=[0.1, 0.5])
+    sweep.add_argument("--gammas", type=_floats, default=[0.9, 0.95])
+    sweep.add_argument("--epsilons", type=_floats, default=[0.1])
+    sweep.add_argument("--episodes", type=_ints, default=[200, 800])
+    sweep.add_argument("--seeds", type=_ints, default=[123])
+    sweep.add_argument("--workers", type=int, default=None)
     sub.add_parser("vision")
+    track = sub.add_parser("track", help="track red objects in a video, image folder/glob or camera index")
+    track.add_argument("source")
+    track.add_argument("--margin", type=int, default=48)
+    track.add_argument("--reacquire-every", type=int, default=30)
     sub.add_parser("crypto")
     args = parser.parse_args()
 
@@ -86,8 +140,12 @@ def main() -> None:
         cmd_plan()
     elif args.cmd == "qlearn":
         cmd_qlearn()
+    elif args.cmd == "sweep":
+        cmd_sweep(args)
     elif args.cmd == "vision":
         cmd_vision()
+    elif args.cmd == "track":
+        cmd_track(args)
     elif args.cmd == "crypto":
         cmd_crypto()
 
@@ -1,8 +1,76 @@
-from typing import Tuple, List, Optional
+from dataclasses import dataclass
+from typing import Callable, Tuple, List, Optional, Union
 import random
 import numpy as np
 
 from ..robotics.grid_world import GridWorld, Coord
+from .q_tables import DenseQTable, QTable
+
+# up, right, down, left in (dx, dy)
+MOVES: List[Coord] = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+# A state is a Coord, or GridWorld.to_index(coord) when the env is encoded.
+State = Union[Coord, int]
+
+
+def transition_tables(
+    grid: GridWorld, step_penalty: float = -1.0, goal_reward: float = 100.0, invalid_penalty: float = -5.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    # next_state[s, a] and reward[s, a] over GridWorld.to_index() states,
+    # reproducing GridWorldEnv.step() for every state and action.
+    W, H = grid.width, grid.height
+    index = np.arange(W * H, dtype=np.int64)
+    xs, ys = np.divmod(index, H)
+    blocked = np.pad(grid.occupancy, 1, constant_values=True)
+    next_state = np.empty((W * H, len(MOVES)), dtype=np.int64)
+    reward = np.full((W * H, len(MOVES)), step_penalty, dtype=np.float64)
+    for a, (dx, dy) in enumerate(MOVES):
+        invalid = blocked[ys + dy + 1, xs + dx + 1]
+        next_state[:, a] = np.where(invalid, index, (xs + dx) * H + ys + dy)
+        reward[invalid, a] += invalid_penalty
+    reward[next_state == grid.to_index(grid.goal)] += goal_reward
+    return next_state, reward
+
+
+@dataclass
+class EpisodeStats:
+    episode: int
+    episode_return: float
+    steps: int
+    max_td_error: float  # largest |TD error| seen during the episode
+    path_length: Optional[int] = None  # greedy path length on check episodes, -1 if it misses the goal
+
+
+@dataclass
+class EarlyStopping:
+    # Training stops when any configured criterion holds: the Q-table moved
+    # by less than q_delta_tol in each of the last `patience` episodes, or
+    # the greedy path reached the goal unchanged for stable_path_checks
+    # consecutive checks (made every check_every episodes).
+    q_delta_tol: Optional[float] = None
+    patience: int = 10
+    stable_path_checks: Optional[int] = None
+    check_every: int = 10
+
+    def __post_init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._quiet = 0
+        self._stable = 0
+        self._last_path: Optional[List[Coord]] = None
+
+    def update(self, stats: EpisodeStats, alpha: float, path: Optional[List[Coord]]) -> bool:
+        stop = False
+        if self.q_delta_tol is not None:
+            self._quiet = self._quiet + 1 if alpha * stats.max_td_error < self.q_delta_tol else 0
+            stop = self._quiet >= self.patience
+        if self.stable_path_checks is not None and path is not None:
+            same = path == self._last_path and stats.path_length is not None and stats.path_length >= 0
+            self._stable = self._stable + 1 if same else 0
+            self._last_path = path
+            stop = stop or self._stable >= self.stable_path_checks
+        return stop
 
 
 class GridWorldEnv:
@@ -14,6 +82,7 @@ class GridWorldEnv:
         invalid_penalty: float = -5.0,
         max_steps: Optional[int] = None,
         seed: int = 42,
+        encoded: bool = False,
     ) -> None:
         self.grid = grid
         self.step_penalty = step_penalty
@@ -21,18 +90,36 @@ class GridWorldEnv:
         self.invalid_penalty = invalid_penalty
         self.max_steps = max_steps or (grid.width * grid.height * 4)
         self.rng = random.Random(seed)
+        # encoded=True uses integer states and precomputed transition tables.
+        self.encoded = encoded
+        if encoded:
+            self.next_state, self.reward = transition_tables(grid, step_penalty, goal_reward, invalid_penalty)
+            self._next_rows = self.next_state.tolist()
+            self._reward_rows = self.reward.tolist()
+            self._goal_index = grid.to_index(grid.goal)
         self.reset()
 
-    def reset(self) -> Coord:
-        self.state: Coord = self.grid.start
+    def encode(self, p: Coord) -> State:
+        return self.grid.to_index(p) if self.encoded else p
+
+    def decode(self, s: State) -> Coord:
+        return self.grid.from_index(s) if self.encoded else s  # type: ignore[return-value]
+
+    def reset(self) -> State:
+        self.state: State = self.encode(self.grid.start)
         self.steps = 0
         return self.state
 
-    def step(self, action: int) -> Tuple[Coord, float, bool, dict]:
+    def step(self, action: int) -> Tuple[State, float, bool, dict]:
+        if self.encoded:
+            s = self.state
+            s2 = self._next_rows[s][action]
+            self.state = s2
+            self.steps += 1
+            done = s2 == self._goal_index or self.steps >= self.max_steps
+            return s2, self._reward_rows[s][action], done, {}
         x, y = self.state
-        # up, right, down, left in (dx, dy)
-        moves = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-        dx, dy = moves[action]
+        dx, dy = MOVES[action]
         new = (x + dx, y + dy)
 
         reward = self.step_penalty
@@ -61,43 +148,187 @@ class GridWorldEnv:
         return (self.grid.width, self.grid.height)
 
 
+class VectorGridWorldEnv:
+    # num_envs independent copies of GridWorldEnv stepped together on arrays.
+    # States are (N, 2) int arrays of (x, y). step() returns the states the
+    # actions led to; environments that finished are then reset, so the next
+    # observations are in self.states.
+
+    def __init__(
+        self,
+        grid: GridWorld,
+        num_envs: int = 16,
+        step_penalty: float = -1.0,
+        goal_reward: float = 100.0,
+        invalid_penalty: float = -5.0,
+        max_steps: Optional[int] = None,
+    ) -> None:
+        self.grid = grid
+        self.num_envs = num_envs
+        self.step_penalty = step_penalty
+        self.goal_reward = goal_reward
+        self.invalid_penalty = invalid_penalty
+        self.max_steps = max_steps or (grid.width * grid.height * 4)
+        # Border of blocked cells so out-of-bounds moves need no extra check.
+        self._blocked = np.pad(grid.occupancy, 1, constant_values=True)
+        self._moves = np.array(MOVES, dtype=np.int64)
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        self.states = np.tile(np.array(self.grid.start, dtype=np.int64), (self.num_envs, 1))
+        self.steps = np.zeros(self.num_envs, dtype=np.int64)
+        return self.states.copy()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        new = self.states + self._moves[actions]
+        invalid = self._blocked[new[:, 1] + 1, new[:, 0] + 1]
+        new[invalid] = self.states[invalid]
+
+        rewards = np.where(invalid, self.step_penalty + self.invalid_penalty, self.step_penalty)
+        self.steps += 1
+        at_goal = (new[:, 0] == self.grid.goal[0]) & (new[:, 1] == self.grid.goal[1])
+        rewards = rewards + np.where(at_goal, self.goal_reward, 0.0)
+        dones = at_goal | (self.steps >= self.max_steps)
+
+        self.states = new.copy()
+        self.states[dones] = self.grid.start
+        self.steps[dones] = 0
+        return new, rewards, dones, {}
+
+    @property
+    def action_space_n(self) -> int:
+        return 4
+
+
 class QLearningAgent:
-    def __init__(self, env: GridWorldEnv, alpha: float = 0.5, gamma: float = 0.95, epsilon: float = 0.1, seed: int = 123) -> None:
+    def __init__(
+        self,
+        env: GridWorldEnv,
+        alpha: float = 0.5,
+        gamma: float = 0.95,
+        epsilon: float = 0.1,
+        seed: int = 123,
+        table: Optional[QTable] = None,
+    ) -> None:
         self.env = env
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
         self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
         W, H = env.grid.width, env.grid.height
-        self.Q = np.zeros((W, H, env.action_space_n), dtype=np.float32)
+        self._height = H
+        # One row per GridWorld.to_index() state; see q_tables for backends.
+        self.table = table if table is not None else DenseQTable(W * H, env.action_space_n)
+        self.history: List[EpisodeStats] = []
+
+    @property
+    def Q(self) -> np.ndarray:
+        # (width, height, actions); a writable view for dense tables, a copy otherwise.
+        return self.table.to_dense().reshape(self.env.grid.width, self._height, -1)
+
+    @Q.setter
+    def Q(self, Q: np.ndarray) -> None:
+        self.warm_start(Q)
 
-    def choose_action(self, state: Coord) -> int:
+    def warm_start(self, Q: np.ndarray) -> None:
+        # Start learning from a known table, e.g. value_iteration(env).
+        self.table.load(Q.reshape(-1, Q.shape[-1]))
+
+    def _qvalues(self, state: State) -> np.ndarray:
+        if self.env.encoded:
+            return self.table.row(state)  # type: ignore[arg-type]
+        x, y = state  # type: ignore[misc]
+        return self.table.row(x * self._height + y)
+
+    def choose_action(self, state: State) -> int:
         if self.rng.random() < self.epsilon:
             return self.rng.randrange(self.env.action_space_n)
-        x, y = state
-        qvalues = self.Q[x, y, :]
-        maxq = float(np.max(qvalues))
-        best_actions = [i for i, q in enumerate(qvalues) if float(q) == maxq]
+        # A short Python list beats NumPy reductions on a 4-element row.
+        qvalues = self._qvalues(state).tolist()
+        maxq = max(qvalues)
+        best_actions = [i for i, q in enumerate(qvalues) if q == maxq]
         return self.rng.choice(best_actions)
 
-    def learn(self, state: Coord, action: int, reward: float, next_state: Coord) -> None:
-        x, y = state
-        nx, ny = next_state
-        best_next = float(np.max(self.Q[nx, ny, :]))
+    def learn(self, state: State, action: int, reward: float, next_state: State) -> float:
+        qvalues = self._qvalues(state)
+        best_next = max(self._qvalues(next_state).tolist())
         td_target = reward + self.gamma * best_next
-        td_error = td_target - float(self.Q[x, y, action])
-        self.Q[x, y, action] = float(self.Q[x, y, action]) + self.alpha * td_error
+        td_error = td_target - float(qvalues[action])
+        qvalues[action] = float(qvalues[action]) + self.alpha * td_error
+        return td_error
 
-    def train(self, episodes: int = 800, max_steps_per_episode: int = 200) -> np.ndarray:
-        for _ in range(episodes):
+    def train(
+        self,
+        episodes: int = 800,
+        max_steps_per_episode: int = 200,
+        callback: Optional[Callable[[EpisodeStats], Optional[bool]]] = None,
+        early_stopping: Optional[EarlyStopping] = None,
+        check_every: int = 0,
+    ) -> np.ndarray:
+        # Per-episode telemetry goes to self.history and to callback, which
+        # may return True to stop. The greedy path is measured every
+        # check_every episodes (0 = only as often as early_stopping needs it).
+        if early_stopping is not None:
+            early_stopping.reset()
+            if early_stopping.stable_path_checks is not None and not check_every:
+                check_every = early_stopping.check_every
+        self.history = []
+        for episode in range(episodes):
             s = self.env.reset()
-            for _ in range(max_steps_per_episode):
+            total, max_td, steps = 0.0, 0.0, 0
+            for steps in range(1, max_steps_per_episode + 1):
                 a = self.choose_action(s)
                 s2, r, done, _ = self.env.step(a)
-                self.learn(s, a, r, s2)
+                td = abs(self.learn(s, a, r, s2))
+                if td > max_td:
+                    max_td = td
+                total += r
                 s = s2
                 if done:
                     break
+            stats = EpisodeStats(episode, total, steps, max_td)
+            path = None
+            if check_every and (episode + 1) % check_every == 0:
+                path = self.derive_greedy_path(max_steps=max_steps_per_episode)
+                stats.path_length = len(path) - 1 if path[-1] == self.env.grid.goal else -1
+            self.history.append(stats)
+            if callback is not None and callback(stats):
+                break
+            if early_stopping is not None and early_stopping.update(stats, self.alpha, path):
+                break
+        return self.Q
+
+    def choose_actions(self, states: np.ndarray) -> np.ndarray:
+        # Batched epsilon-greedy; ties between best actions are broken at random.
+        q = self.table.rows(states[:, 0] * self._height + states[:, 1])
+        best = q == q.max(axis=1, keepdims=True)
+        actions = np.argmax(best * self.np_rng.random(q.shape), axis=1)
+        explore = self.np_rng.random(len(states)) < self.epsilon
+        actions[explore] = self.np_rng.integers(0, q.shape[1], int(explore.sum()))
+        return actions
+
+    def learn_batch(
+        self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray, next_states: np.ndarray
+    ) -> None:
+        s = states[:, 0] * self._height + states[:, 1]
+        best_next = self.table.rows(next_states[:, 0] * self._height + next_states[:, 1]).max(axis=1)
+        td_error = rewards + self.gamma * best_next - self.table.rows(s)[np.arange(len(s)), actions]
+        # Several envs may update the same (state, action); average their TD
+        # errors so a large batch does not multiply the step size.
+        num_actions = self.env.action_space_n
+        cells, inverse = np.unique(s * num_actions + actions, return_inverse=True)
+        mean_error = np.bincount(inverse, weights=td_error) / np.bincount(inverse)
+        self.table.add(cells // num_actions, cells % num_actions, self.alpha * mean_error)
+
+    def train_vectorized(self, venv: VectorGridWorldEnv, steps: int = 2000) -> np.ndarray:
+        # Each step advances all venv.num_envs environments at once.
+        s = venv.reset()
+        for _ in range(steps):
+            a = self.choose_actions(s)
+            s2, r, _, _ = venv.step(a)
+            self.learn_batch(s, a, r, s2)
+            s = venv.states
         return self.Q
 
     def derive_greedy_path(self, start: Optional[Coord] = None, max_steps: int = 500) -> List[Coord]:
@@ -105,12 +336,10 @@ class QLearningAgent:
             start = self.env.grid.start
         # reset env and force start
         self.env.reset()
-        self.env.state = start
-        s = start
-        path: List[Coord] = [s]
+        s = self.env.state = self.env.encode(start)
+        path: List[Coord] = [start]
         for _ in range(max_steps):
-            x, y = s
-            q = self.Q[x, y, :]
+            q = self._qvalues(s)
             a = int(np.argmax(q))
             s2, _, done, _ = self.env.step(a)
             if s2 == s:
@@ -121,8 +350,8 @@ class QLearningAgent:
                         break
                 if s2 == s:
                     break
-            path.append(s2)
+            path.append(self.env.decode(s2))
             s = s2
-            if s == self.env.grid.goal or done:
+            if path[-1] == self.env.grid.goal or done:
                 break
         return path
@@ -0,0 +1,129 @@
+import os
+from typing import Union
+
+import numpy as np
+
+from ..robotics.grid_world import UNREACHABLE, GridWorld, distance_map
+
+# Q-table backends. States are GridWorld.to_index() values; row() returns a
+# writable view of one state's action values, rows()/add() are the batched
+# gather and scatter used by the vectorized trainer.
+
+
+class DenseQTable:
+    def __init__(self, num_states: int, num_actions: int = 4, dtype: np.dtype = np.float32) -> None:
+        self.data = np.zeros((num_states, num_actions), dtype=dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def row(self, state: int) -> np.ndarray:
+        return self.data[state]
+
+    def rows(self, states: np.ndarray) -> np.ndarray:
+        return self.data[states]
+
+    def add(self, states: np.ndarray, actions: np.ndarray, deltas: np.ndarray) -> None:
+        # (state, action) pairs must be unique.
+        self.data[states, actions] += deltas.astype(self.data.dtype)
+
+    def to_dense(self) -> np.ndarray:
+        return self.data
+
+    def load(self, dense: np.ndarray) -> None:
+        self.data[...] = dense
+
+
+class MemmapQTable(DenseQTable):
+    # Dense table in an .npy file. Opening an existing file resumes from it;
+    # call flush() to checkpoint.
+
+    def __init__(self, path: str, num_states: int, num_actions: int = 4, dtype: np.dtype = np.float32) -> None:
+        shape = (num_states, num_actions)
+        if os.path.exists(path):
+            data = np.load(path, mmap_mode="r+")
+            if data.shape != shape or data.dtype != np.dtype(dtype):
+                raise ValueError(f"{path} holds a {data.dtype} table of shape {data.shape}, expected {shape}")
+        else:
+            data = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+        self.path = path
+        self.data = data
+
+    def flush(self) -> None:
+        self.data.flush()
+
+
+# Number of set bits in every byte value.
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int32)
+
+
+class ReachableQTable:
+    # Stores rows only for free cells reachable from the start; every other
+    # state reads as zeros and writes to it are dropped. Row slots come from
+    # a bitmap of reachable states plus a running count per byte of it
+    # (about 0.6 bytes per state), so the index stays far smaller than the
+    # rows it saves.
+
+    def __init__(self, grid: GridWorld, num_actions: int = 4, dtype: np.dtype = np.float32) -> None:
+        self.num_states = grid.width * grid.height
+        cached = grid._flat_table is not None
+        reachable = distance_map(grid, grid.start) < UNREACHABLE
+        if not cached:
+            # distance_map cached the neighbor table (4 bytes per cell) on the
+            # grid; do not keep it alive just for this one search.
+            grid._flat_table = None
+        self.bits = np.packbits(reachable, bitorder="little")
+        counts = _POPCOUNT[self.bits]
+        self.offsets = np.empty(len(self.bits), dtype=np.int32)
+        self.offsets[0] = 0
+        np.cumsum(counts[:-1], out=self.offsets[1:])
+        size = int(self.offsets[-1] + counts[-1]) if len(self.bits) else 0
+        # The extra last row is scratch space for unreachable states.
+        self.data = np.zeros((size + 1, num_actions), dtype=dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.bits.nbytes + self.offsets.nbytes
+
+    @property
+    def cells(self) -> np.ndarray:
+        # Reachable states in slot order.
+        bits = np.unpackbits(self.bits, count=self.num_states, bitorder="little")
+        return np.flatnonzero(bits).astype(np.int32)
+
+    def _slots(self, states: np.ndarray) -> np.ndarray:
+        states = np.asarray(states, dtype=np.int64)
+        byte, bit = states >> 3, (states & 7).astype(np.uint8)
+        word = self.bits[byte]
+        slots = self.offsets[byte] + _POPCOUNT[word & ((np.uint8(1) << bit) - np.uint8(1))]
+        slots[((word >> bit) & 1) == 0] = len(self.data) - 1
+        return slots
+
+    def row(self, state: int) -> np.ndarray:
+        word = int(self.bits[state >> 3])
+        bit = state & 7
+        if (word >> bit) & 1:
+            return self.data[int(self.offsets[state >> 3]) + int(_POPCOUNT[word & ((1 << bit) - 1)])]
+        scratch = self.data[-1]
+        scratch[:] = 0
+        return scratch
+
+    def rows(self, states: np.ndarray) -> np.ndarray:
+        self.data[-1] = 0
+        return self.data[self._slots(states)]
+
+    def add(self, states: np.ndarray, actions: np.ndarray, deltas: np.ndarray) -> None:
+        self.data[self._slots(states), actions] += deltas.astype(self.data.dtype)
+        self.data[-1] = 0
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.zeros((self.num_states, self.data.shape[1]), dtype=self.data.dtype)
+        dense[self.cells] = self.data[:-1]
+        return dense
+
+    def load(self, dense: np.ndarray) -> None:
+        self.data[:-1] = dense[self.cells]
+
+
+QTable = Union[DenseQTable, ReachableQTable]
@@ -0,0 +1,115 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..robotics.grid_world import GridWorld
+from .q_learning import GridWorldEnv, QLearningAgent
+
+
+@dataclass
+class SweepConfig:
+    alpha: float = 0.5
+    gamma: float = 0.95
+    epsilon: float = 0.1
+    episodes: int = 800
+    seed: int = 123
+    max_steps_per_episode: int = 200
+
+
+@dataclass
+class SweepResult:
+    config: SweepConfig
+    path_length: int  # greedy path length, -1 if it does not reach the goal
+    episode_return: float  # return of one greedy rollout
+    wall_time: float
+    Q: np.ndarray = field(repr=False)
+
+
+def sweep_configs(
+    alphas: Sequence[float] = (0.5,),
+    gammas: Sequence[float] = (0.95,),
+    epsilons: Sequence[float] = (0.1,),
+    episodes: Sequence[int] = (800,),
+    seeds: Sequence[int] = (123,),
+    max_steps_per_episode: int = 200,
+) -> List[SweepConfig]:
+    return [
+        SweepConfig(a, g, e, n, s, max_steps_per_episode)
+        for a, g, e, n, s in itertools.product(alphas, gammas, epsilons, episodes, seeds)
+    ]
+
+
+def greedy_return(agent: QLearningAgent, max_steps: int) -> float:
+    env = agent.env
+    s = env.reset()
+    total = 0.0
+    for _ in range(max_steps):
+        s, r, done, _ = env.step(int(np.argmax(agent._qvalues(s))))
+        total += r
+        if done:
+            break
+    return total
+
+
+# Per-worker state, set once by _init_worker instead of pickled per task.
+_grid: Optional[GridWorld] = None
+_tables: Optional[np.ndarray] = None
+_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _init_worker(grid: GridWorld, shm_name: str, shape: Tuple[int, ...]) -> None:
+    global _grid, _shm, _tables
+    _grid = grid
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _tables = np.ndarray(shape, dtype=np.float32, buffer=_shm.buf)
+
+
+def _run_one(index: int, config: SweepConfig) -> Tuple[int, int, float, float]:
+    assert _grid is not None and _tables is not None
+    t0 = time.perf_counter()
+    env = GridWorldEnv(_grid, max_steps=config.max_steps_per_episode, seed=config.seed, encoded=True)
+    agent = QLearningAgent(env, config.alpha, config.gamma, config.epsilon, config.seed)
+    agent.train(config.episodes, config.max_steps_per_episode)
+    wall_time = time.perf_counter() - t0
+    path = agent.derive_greedy_path(max_steps=config.max_steps_per_episode)
+    path_length = len(path) - 1 if path[-1] == _grid.goal else -1
+    _tables[index] = agent.Q
+    return index, path_length, greedy_return(agent, config.max_steps_per_episode), wall_time
+
+
+def run_sweep(grid: GridWorld, configs: Sequence[SweepConfig], workers: Optional[int] = None) -> List[SweepResult]:
+    # Each worker trains its configurations and writes the Q-table into its
+    # slot of one shared block, so only a few numbers are pickled back.
+    shape = (len(configs), grid.width, grid.height, 4)
+    nbytes = max(1, int(np.prod(shape)) * np.dtype(np.float32).itemsize)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    try:
+        tables = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        workers = workers or min(len(configs), os.cpu_count() or 1) or 1
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(grid, shm.name, shape)) as pool:
+            rows = list(pool.map(_run_one, range(len(configs)), configs))
+        results = [
+            SweepResult(configs[i], length, ret, wall, tables[i].copy()) for i, length, ret, wall in rows
+        ]
+        del tables
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
+
+
+def format_results(results: Sequence[SweepResult]) -> str:
+    lines = ["alpha,gamma,epsilon,episodes,seed,path_length,return,wall_time"]
+    for r in results:
+        c = r.config
+        lines.append(
+            f"{c.alpha},{c.gamma},{c.epsilon},{c.episodes},{c.seed},"
+            f"{r.path_length},{r.episode_return:.2f},{r.wall_time:.3f}"
+        )
+    return "\n".join(lines)
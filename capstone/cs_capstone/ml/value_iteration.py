@@ -0,0 +1,35 @@
+from typing import Optional
+
+import numpy as np
+
+from .q_learning import GridWorldEnv, transition_tables
+
+
+def value_iteration(
+    env: GridWorldEnv, gamma: float = 0.95, tol: float = 1e-6, max_iters: Optional[int] = None
+) -> np.ndarray:
+    # Optimal Q* of shape (width, height, 4) for env's deterministic dynamics,
+    # in the same layout as QLearningAgent.Q. The goal is terminal, so its
+    # row stays zero just like in a trained Q-table; the step limit is ignored.
+    grid = env.grid
+    next_state, reward = transition_tables(grid, env.step_penalty, env.goal_reward, env.invalid_penalty)
+    goal = grid.to_index(grid.goal)
+    if max_iters is None:
+        max_iters = 10 * grid.width * grid.height + 1000
+    # Sweep on V (one value per state) with a reused buffer; Q* is read off
+    # the converged V at the end.
+    v = np.zeros(len(next_state), dtype=np.float64)
+    buf = np.empty(next_state.shape, dtype=np.float64)
+    for _ in range(max_iters):
+        np.take(v, next_state, out=buf)
+        buf *= gamma
+        buf += reward
+        new_v = buf.max(axis=1)
+        new_v[goal] = 0.0
+        delta = float(np.abs(new_v - v).max())
+        v = new_v
+        if delta < tol:
+            break
+    q = reward + gamma * v[next_state]
+    q[goal] = 0.0
+    return q.reshape(grid.width, grid.height, -1)
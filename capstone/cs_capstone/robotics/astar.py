@@ -1,14 +1,26 @@
 import heapq
+from dataclasses import dataclass
+import numpy as np
 from typing import Dict, Tuple, List, Optional
 
 from .grid_world import GridWorld, Coord
 
 
+@dataclass
+class SearchStats:
+    expansions: int = 0
+
+
 def heuristic(a: Coord, b: Coord) -> float:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 
-def astar(grid: GridWorld, start: Optional[Coord] = None, goal: Optional[Coord] = None) -> List[Coord]:
+def astar(
+    grid: GridWorld,
+    start: Optional[Coord] = None,
+    goal: Optional[Coord] = None,
+    stats: Optional[SearchStats] = None,
+) -> List[Coord]:
     if start is None:
         start = grid.start
     if goal is None:
@@ -22,6 +34,8 @@ def astar(grid: GridWorld, start: Optional[Coord] = None, goal: Optional[Coord]
 
     while frontier:
         _, current = heapq.heappop(frontier)
+        if stats is not None:
+            stats.expansions += 1
         if current == goal:
             break
 
@@ -43,3 +57,58 @@ def astar(grid: GridWorld, start: Optional[Coord] = None, goal: Optional[Coord]
         cur = came_from[cur]
     path.reverse()
     return path
+
+
+def astar_flat(
+    grid: GridWorld,
+    start: Optional[Coord] = None,
+    goal: Optional[Coord] = None,
+    stats: Optional[SearchStats] = None,
+) -> List[Coord]:
+    if start is None:
+        start = grid.start
+    if goal is None:
+        goal = grid.goal
+
+    H = grid.height
+    offsets, valid = grid.flat_neighbor_table()
+    moves = [(int(off), valid[k]) for k, off in enumerate(offsets)]
+    n = grid.width * H
+    g_score = np.full(n, np.inf, dtype=np.float64)
+    parent = np.full(n, -1, dtype=np.int64)
+
+    s = grid.to_index(start)
+    t = grid.to_index(goal)
+    gx, gy = goal
+    g_score[s] = 0.0
+    parent[s] = s
+    frontier: List[Tuple[float, int]] = [(0.0, s)]
+
+    while frontier:
+        _, cur = heapq.heappop(frontier)
+        if stats is not None:
+            stats.expansions += 1
+        if cur == t:
+            break
+        new_cost = g_score[cur] + 1.0
+        for off, ok in moves:
+            if not ok[cur]:
+                continue
+            nxt = cur + off
+            if new_cost < g_score[nxt]:
+                g_score[nxt] = new_cost
+                parent[nxt] = cur
+                x, y = divmod(nxt, H)
+                heapq.heappush(frontier, (new_cost + abs(x - gx) + abs(y - gy), nxt))
+
+    if parent[t] < 0:
+        return []
+
+    path: List[Coord] = []
+    cur = t
+    while cur != s:
+        path.append(grid.from_index(cur))
+        cur = int(parent[cur])
+    path.append(start)
+    path.reverse()
+    return path
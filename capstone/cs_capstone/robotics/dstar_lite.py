@@ -0,0 +1,122 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from .grid_world import GridWorld, Coord
+from .astar import SearchStats, heuristic
+
+INF = float("inf")
+Key = Tuple[float, float]
+
+
+class DStarLite:
+    # Incremental planner (Koenig & Likhachev's optimised D* Lite). The search
+    # runs backwards from the goal, so moving the start and changing obstacles
+    # only repairs the part of the search tree they affect.
+
+    def __init__(self, grid: GridWorld, start: Optional[Coord] = None, goal: Optional[Coord] = None) -> None:
+        self.grid = grid
+        self.start = grid.start if start is None else start
+        self.goal = grid.goal if goal is None else goal
+        self.km = 0.0
+        self.g: Dict[Coord, float] = {}
+        self.rhs: Dict[Coord, float] = {self.goal: 0.0}
+        self._open: Dict[Coord, Key] = {}
+        self._heap: List[Tuple[Key, Coord]] = []
+        self._push(self.goal, self._key(self.goal))
+
+    def plan(self, stats: Optional[SearchStats] = None) -> List[Coord]:
+        self._compute_shortest_path(stats)
+        if self._g(self.start) == INF:
+            return []
+        path = [self.start]
+        cur = self.start
+        while cur != self.goal:
+            best: Optional[Coord] = None
+            best_cost = INF
+            for nxt in self.grid.neighbors(cur):
+                cost = self.grid.cost(cur, nxt) + self._g(nxt)
+                if cost < best_cost:
+                    best, best_cost = nxt, cost
+            if best is None:
+                return []
+            path.append(best)
+            cur = best
+        return path
+
+    def move_start(self, p: Coord) -> None:
+        self.km += heuristic(self.start, p)
+        self.start = p
+
+    def add_obstacle(self, p: Coord) -> None:
+        self._set_cell(p, True)
+
+    def remove_obstacle(self, p: Coord) -> None:
+        self._set_cell(p, False)
+
+    def _set_cell(self, p: Coord, blocked: bool) -> None:
+        if self.grid.passable(p) != blocked:
+            return
+        self.grid.set_obstacle(p, blocked)
+        self._update_vertex(p)
+        for u in self.grid.neighbors(p):
+            self._update_vertex(u)
+
+    def _g(self, p: Coord) -> float:
+        return self.g.get(p, INF)
+
+    def _rhs(self, p: Coord) -> float:
+        return self.rhs.get(p, INF)
+
+    def _key(self, p: Coord) -> Key:
+        m = min(self._g(p), self._rhs(p))
+        return (m + heuristic(self.start, p) + self.km, m)
+
+    def _push(self, p: Coord, key: Key) -> None:
+        self._open[p] = key
+        heapq.heappush(self._heap, (key, p))
+
+    def _top(self) -> Optional[Tuple[Key, Coord]]:
+        # Entries whose key was superseded or removed are skipped lazily.
+        while self._heap:
+            key, p = self._heap[0]
+            if self._open.get(p) == key:
+                return key, p
+            heapq.heappop(self._heap)
+        return None
+
+    def _update_vertex(self, u: Coord) -> None:
+        if u != self.goal:
+            if self.grid.passable(u):
+                self.rhs[u] = min(
+                    (self.grid.cost(u, s) + self._g(s) for s in self.grid.neighbors(u)), default=INF
+                )
+            else:
+                self.rhs[u] = INF
+        if self._g(u) != self._rhs(u):
+            self._push(u, self._key(u))
+        else:
+            self._open.pop(u, None)
+
+    def _compute_shortest_path(self, stats: Optional[SearchStats]) -> None:
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            k_old, u = top
+            if not (k_old < self._key(self.start) or self._rhs(self.start) != self._g(self.start)):
+                break
+            if stats is not None:
+                stats.expansions += 1
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u, k_new)
+            elif self._g(u) > self._rhs(u):
+                self.g[u] = self._rhs(u)
+                del self._open[u]
+                for s in self.grid.neighbors(u):
+                    self._update_vertex(s)
+            else:
+                self.g[u] = INF
+                self._update_vertex(u)
+                for s in self.grid.neighbors(u):
+                    self._update_vertex(s)
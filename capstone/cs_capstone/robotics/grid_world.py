@@ -1,25 +1,104 @@
-from dataclasses import dataclass
-from typing import Set, Tuple, List
+from typing import Iterable, Iterator, MutableSet, Optional, Tuple, List
 import numpy as np
 
 
 Coord = Tuple[int, int]
 
+# Same order as GridWorld.neighbors(); search results depend on it.
+NEIGHBOR_STEPS: List[Coord] = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+UNREACHABLE = 1 << 30
+
+
+class ObstacleSet(MutableSet[Coord]):
+    # Set-of-Coord view over GridWorld.occupancy: reads and writes go to the
+    # array, so code written against the old obstacle set keeps working.
+    # Like passable(), cells off the grid are never obstacles; adding one
+    # has no effect.
+
+    def __init__(self, grid: "GridWorld") -> None:
+        self._grid = grid
+
+    def __contains__(self, p: object) -> bool:
+        return isinstance(p, tuple) and len(p) == 2 and not self._grid.passable(p)
+
+    def __iter__(self) -> Iterator[Coord]:
+        ys, xs = np.nonzero(self._grid.occupancy)
+        return iter(list(zip(xs.tolist(), ys.tolist())))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._grid.occupancy))
+
+    def __repr__(self) -> str:
+        return f"ObstacleSet({set(self)!r})"
+
+    def add(self, p: Coord) -> None:
+        if self._grid.in_bounds(p):
+            self._grid.set_obstacle(p, True)
+
+    def discard(self, p: Coord) -> None:
+        if self._grid.in_bounds(p):
+            self._grid.set_obstacle(p, False)
+
 
-@dataclass
 class GridWorld:
-    width: int
-    height: int
-    obstacles: Set[Coord]
-    start: Coord
-    goal: Coord
+    # The (height, width) boolean `occupancy` array is the only obstacle
+    # store. `obstacles` is a mutable set view of it (ObstacleSet), so the
+    # Coord-based and array-based planners always see the same map.
+    # Obstacles outside the grid are ignored.
+
+    def __init__(self, width: int, height: int, obstacles: Iterable[Coord], start: Coord, goal: Coord) -> None:
+        self.width = width
+        self.height = height
+        self.start = start
+        self.goal = goal
+        self._flat_table: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.obstacles = obstacles  # type: ignore[assignment]
+
+    @classmethod
+    def from_numpy(cls, grid: np.ndarray, start: Coord, goal: Coord) -> "GridWorld":
+        occ = np.asarray(grid) != 0
+        world = cls(occ.shape[1], occ.shape[0], (), start, goal)
+        world.occupancy = occ
+        return world
+
+    @property
+    def obstacles(self) -> ObstacleSet:
+        return ObstacleSet(self)
+
+    @obstacles.setter
+    def obstacles(self, cells: Iterable[Coord]) -> None:
+        occupancy = np.zeros((self.height, self.width), dtype=bool)
+        coords = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+        xs, ys = coords.T
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        occupancy[ys[inside], xs[inside]] = True
+        self.occupancy = occupancy
+        self._flat_table = None
+
+    def __repr__(self) -> str:
+        return (
+            f"GridWorld(width={self.width}, height={self.height}, "
+            f"obstacles={int(self.occupancy.sum())}, start={self.start}, goal={self.goal})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GridWorld):
+            return NotImplemented
+        return (
+            (self.width, self.height, self.start, self.goal) == (other.width, other.height, other.start, other.goal)
+            and np.array_equal(self.occupancy, other.occupancy)
+        )
 
     def in_bounds(self, p: Coord) -> bool:
         x, y = p
         return 0 <= x < self.width and 0 <= y < self.height
 
     def passable(self, p: Coord) -> bool:
-        return p not in self.obstacles
+        # Cells off the grid count as passable, as with the old obstacle set;
+        # neighbors() checks bounds separately.
+        x, y = p
+        return not (0 <= x < self.width and 0 <= y < self.height and self.occupancy[y, x])
 
     def neighbors(self, p: Coord) -> List[Coord]:
         x, y = p
@@ -29,8 +108,58 @@ class GridWorld:
     def cost(self, a: Coord, b: Coord) -> float:
         return 1.0
 
+    def set_obstacle(self, p: Coord, blocked: bool = True) -> None:
+        if not self.in_bounds(p):
+            raise ValueError(f"{p} is outside the {self.width}x{self.height} grid")
+        x, y = p
+        self.occupancy[y, x] = blocked
+        self._flat_table = None
+
+    def to_index(self, p: Coord) -> int:
+        # Column-major so that index order matches Coord tuple order.
+        return p[0] * self.height + p[1]
+
+    def from_index(self, i: int) -> Coord:
+        x, y = divmod(i, self.height)
+        return (x, y)
+
+    def flat_neighbor_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        # offsets[k] is the index delta of NEIGHBOR_STEPS[k]; valid[k, i] is True
+        # when that move from cell i stays on the grid and lands on a free cell.
+        if self._flat_table is None:
+            free = ~self.occupancy.T  # (width, height), matches to_index
+            offsets = np.array([dx * self.height + dy for dx, dy in NEIGHBOR_STEPS], dtype=np.int64)
+            valid = np.zeros((len(NEIGHBOR_STEPS),) + free.shape, dtype=bool)
+            valid[0, :-1, :] = free[1:, :]
+            valid[1, 1:, :] = free[:-1, :]
+            valid[2, :, :-1] = free[:, 1:]
+            valid[3, :, 1:] = free[:, :-1]
+            self._flat_table = (offsets, valid.reshape(len(NEIGHBOR_STEPS), -1))
+        return self._flat_table
+
     def to_numpy(self) -> np.ndarray:
-        grid = np.zeros((self.height, self.width), dtype=np.uint8)
-        for (x, y) in self.obstacles:
-            grid[y, x] = 1
-        return grid
+        return self.occupancy.astype(np.uint8)
+
+
+def distance_map(grid: GridWorld, goal: Coord) -> np.ndarray:
+    # Exact obstacle-aware distance from every cell to goal (UNREACHABLE where
+    # cut off), as a flat array over GridWorld.to_index(). Computed by a
+    # breadth-first wavefront that handles one whole distance level per step.
+    offsets, valid = grid.flat_neighbor_table()
+    n = valid.shape[1]
+    dist = np.full(n, UNREACHABLE, dtype=np.int32)
+    owner = np.empty(n, dtype=np.int32)
+    frontier = np.array([grid.to_index(goal)], dtype=np.int64)
+    dist[frontier] = 0
+    level = 0
+    while frontier.size:
+        level += 1
+        nb = np.concatenate([frontier[valid[k, frontier]] + offsets[k] for k in range(len(offsets))])
+        nb = nb[dist[nb] == UNREACHABLE]
+        # Drop duplicates without sorting: keep the last writer of each cell.
+        order = np.arange(nb.size)
+        owner[nb] = order
+        nb = nb[owner[nb] == order]
+        dist[nb] = level
+        frontier = nb
+    return dist
@@ -0,0 +1,244 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .grid_world import GridWorld, Coord
+from .astar import SearchStats, heuristic
+
+Cluster = Tuple[int, int]
+Border = Tuple[Cluster, Cluster]
+
+# Entrance runs at least this long get a transition at each end instead of one
+# in the middle, as in the original HPA* paper.
+LONG_ENTRANCE = 6
+
+
+class HierarchicalPlanner:
+    def __init__(self, grid: GridWorld, cluster_size: int = 10) -> None:
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cols = (grid.width + cluster_size - 1) // cluster_size
+        self.rows = (grid.height + cluster_size - 1) // cluster_size
+        self._borders: Dict[Border, List[Tuple[Coord, Coord]]] = {}
+        self._inter: Dict[Coord, Dict[Coord, float]] = {}
+        self._intra: Dict[Cluster, Dict[Coord, Dict[Coord, float]]] = {}
+        for cluster in self.clusters():
+            for border in self._borders_of(cluster):
+                if border[0] == cluster:
+                    self._build_border(border)
+        for cluster in self.clusters():
+            self._build_intra(cluster)
+
+    def clusters(self) -> Iterable[Cluster]:
+        for cy in range(self.rows):
+            for cx in range(self.cols):
+                yield (cx, cy)
+
+    def cluster_of(self, p: Coord) -> Cluster:
+        return (p[0] // self.cluster_size, p[1] // self.cluster_size)
+
+    def entrance_nodes(self, cluster: Cluster) -> Set[Coord]:
+        nodes: Set[Coord] = set()
+        for border in self._borders_of(cluster):
+            side = 0 if border[0] == cluster else 1
+            nodes.update(pair[side] for pair in self._borders.get(border, []))
+        return nodes
+
+    def set_obstacle(self, p: Coord, blocked: bool = True) -> None:
+        self.grid.set_obstacle(p, blocked)
+        self.update_cluster(self.cluster_of(p))
+
+    def update_cluster(self, cluster: Cluster) -> None:
+        # Only this cluster's borders can change, which in turn changes the
+        # entrance nodes of the cluster and of its direct neighbours.
+        touched = {cluster}
+        for border in self._borders_of(cluster):
+            self._build_border(border)
+            touched.update(border)
+        for c in touched:
+            self._build_intra(c)
+
+    def plan(
+        self,
+        start: Optional[Coord] = None,
+        goal: Optional[Coord] = None,
+        stats: Optional[SearchStats] = None,
+    ) -> List[Coord]:
+        if start is None:
+            start = self.grid.start
+        if goal is None:
+            goal = self.grid.goal
+        if not self.grid.passable(start) or not self.grid.passable(goal):
+            return []
+        if start == goal:
+            return [start]
+
+        sc, gc = self.cluster_of(start), self.cluster_of(goal)
+        extra: Dict[Coord, Dict[Coord, float]] = {}
+        start_targets = self.entrance_nodes(sc) | ({goal} if sc == gc else set())
+        start_dist = self._bfs_in_cluster(start, sc, start_targets)
+        goal_dist = self._bfs_in_cluster(goal, gc, self.entrance_nodes(gc))
+        extra[start] = {n: float(d) for n, d in start_dist.items() if n != goal}
+        for n, d in goal_dist.items():
+            extra.setdefault(n, {})[goal] = float(d)
+        if sc == gc and goal in start_dist:
+            extra[start][goal] = float(start_dist[goal])
+
+        abstract = self._abstract_search(start, goal, extra, stats)
+        if not abstract:
+            return []
+
+        path = [start]
+        for u, v in zip(abstract, abstract[1:]):
+            if self.cluster_of(u) != self.cluster_of(v):
+                path.append(v)
+            else:
+                path.extend(self._refine(u, v)[1:])
+        return path
+
+    def _abstract_search(
+        self,
+        start: Coord,
+        goal: Coord,
+        extra: Dict[Coord, Dict[Coord, float]],
+        stats: Optional[SearchStats],
+    ) -> List[Coord]:
+        frontier: List[Tuple[float, Coord]] = [(heuristic(start, goal), start)]
+        came_from: Dict[Coord, Optional[Coord]] = {start: None}
+        cost_so_far: Dict[Coord, float] = {start: 0.0}
+        closed: Set[Coord] = set()
+
+        while frontier:
+            _, current = heapq.heappop(frontier)
+            if current in closed:
+                continue
+            closed.add(current)
+            if stats is not None:
+                stats.expansions += 1
+            if current == goal:
+                break
+            for nxt, cost in self._abstract_neighbors(current, extra):
+                new_cost = cost_so_far[current] + cost
+                if new_cost < cost_so_far.get(nxt, float("inf")):
+                    cost_so_far[nxt] = new_cost
+                    came_from[nxt] = current
+                    heapq.heappush(frontier, (new_cost + heuristic(nxt, goal), nxt))
+
+        if goal not in came_from:
+            return []
+        path: List[Coord] = []
+        cur: Optional[Coord] = goal
+        while cur is not None:
+            path.append(cur)
+            cur = came_from[cur]
+        path.reverse()
+        return path
+
+    def _abstract_neighbors(self, p: Coord, extra: Dict[Coord, Dict[Coord, float]]) -> Iterable[Tuple[Coord, float]]:
+        yield from self._intra.get(self.cluster_of(p), {}).get(p, {}).items()
+        yield from self._inter.get(p, {}).items()
+        yield from extra.get(p, {}).items()
+
+    def _cluster_bounds(self, cluster: Cluster) -> Tuple[int, int, int, int]:
+        k = self.cluster_size
+        cx, cy = cluster
+        return cx * k, cy * k, min((cx + 1) * k, self.grid.width), min((cy + 1) * k, self.grid.height)
+
+    def _borders_of(self, cluster: Cluster) -> List[Border]:
+        cx, cy = cluster
+        borders: List[Border] = []
+        if cx > 0:
+            borders.append(((cx - 1, cy), cluster))
+        if cx + 1 < self.cols:
+            borders.append((cluster, (cx + 1, cy)))
+        if cy > 0:
+            borders.append(((cx, cy - 1), cluster))
+        if cy + 1 < self.rows:
+            borders.append((cluster, (cx, cy + 1)))
+        return borders
+
+    def _build_border(self, border: Border) -> None:
+        for a, b in self._borders.get(border, []):
+            self._unlink(a, b)
+            self._unlink(b, a)
+
+        (ax, ay), (bx, by) = border
+        x0, y0, x1, y1 = self._cluster_bounds(border[0])
+        if bx > ax:
+            pairs = [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        else:
+            pairs = [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+
+        transitions: List[Tuple[Coord, Coord]] = []
+        runs: List[List[Tuple[Coord, Coord]]] = [[]]
+        for a, b in pairs:
+            if self.grid.passable(a) and self.grid.passable(b):
+                runs[-1].append((a, b))
+            elif runs[-1]:
+                runs.append([])
+        for run in runs:
+            if len(run) >= LONG_ENTRANCE:
+                transitions.extend([run[0], run[-1]])
+            elif run:
+                transitions.append(run[len(run) // 2])
+
+        self._borders[border] = transitions
+        for a, b in transitions:
+            self._inter.setdefault(a, {})[b] = 1.0
+            self._inter.setdefault(b, {})[a] = 1.0
+
+    def _unlink(self, a: Coord, b: Coord) -> None:
+        links = self._inter.get(a)
+        if links is not None:
+            links.pop(b, None)
+            if not links:
+                del self._inter[a]
+
+    def _build_intra(self, cluster: Cluster) -> None:
+        nodes = self.entrance_nodes(cluster)
+        edges: Dict[Coord, Dict[Coord, float]] = {}
+        for n in nodes:
+            dist = self._bfs_in_cluster(n, cluster, nodes)
+            edges[n] = {m: float(d) for m, d in dist.items() if m != n}
+        self._intra[cluster] = edges
+
+    def _bfs_in_cluster(self, source: Coord, cluster: Cluster, targets: Iterable[Coord]) -> Dict[Coord, int]:
+        dist, _, x0, y0, w = self._local_bfs(source, cluster)
+        result = {}
+        for t in targets:
+            d = dist[(t[1] - y0) * w + (t[0] - x0)]
+            if d >= 0:
+                result[t] = d
+        return result
+
+    def _local_bfs(self, source: Coord, cluster: Cluster) -> Tuple[List[int], List[int], int, int, int]:
+        # Breadth-first search confined to one cluster, on local row-major
+        # indices so it does not allocate a tuple per visited cell.
+        x0, y0, x1, y1 = self._cluster_bounds(cluster)
+        w = x1 - x0
+        n = w * (y1 - y0)
+        blocked = self.grid.occupancy[y0:y1, x0:x1].ravel().tolist()
+        dist = [-1] * n
+        parent = [-1] * n
+        s = (source[1] - y0) * w + (source[0] - x0)
+        dist[s] = 0
+        queue = [s]
+        for cur in queue:
+            cx = cur % w
+            d = dist[cur] + 1
+            for nxt, ok in ((cur + 1, cx + 1 < w), (cur - 1, cx > 0), (cur + w, cur + w < n), (cur - w, cur >= w)):
+                if ok and dist[nxt] < 0 and not blocked[nxt]:
+                    dist[nxt] = d
+                    parent[nxt] = cur
+                    queue.append(nxt)
+        return dist, parent, x0, y0, w
+
+    def _refine(self, u: Coord, v: Coord) -> List[Coord]:
+        _, parent, x0, y0, w = self._local_bfs(u, self.cluster_of(u))
+        cur = (v[1] - y0) * w + (v[0] - x0)
+        path: List[Coord] = []
+        while cur >= 0:
+            y, x = divmod(cur, w)
+            path.append((x0 + x, y0 + y))
+            cur = parent[cur]
+        path.reverse()
+        return path
@@ -0,0 +1,230 @@
+import heapq
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .grid_world import GridWorld, Coord
+from .astar import SearchStats
+
+SQRT2 = math.sqrt(2.0)
+Dir = Tuple[int, int]
+
+
+def octile(a: Coord, b: Coord) -> float:
+    dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return max(dx, dy) + (SQRT2 - 1.0) * min(dx, dy)
+
+
+def _sign(v: int) -> int:
+    return int(v > 0) - int(v < 0)
+
+
+def jps(
+    grid: GridWorld,
+    start: Optional[Coord] = None,
+    goal: Optional[Coord] = None,
+    diagonal: bool = False,
+    stats: Optional[SearchStats] = None,
+) -> List[Coord]:
+    # diagonal=False uses the same 4-connected moves as astar(); diagonal=True
+    # allows 8-connected moves costing sqrt(2) that never cut corners.
+    if start is None:
+        start = grid.start
+    if goal is None:
+        goal = grid.goal
+
+    # Pad by one blocked cell so the jump loops need no bounds checks.
+    padded = np.zeros((grid.width + 2, grid.height + 2), dtype=bool)
+    padded[1:-1, 1:-1] = ~grid.occupancy.T
+    free = padded.tolist()
+    walkable: Callable[[int, int], bool] = lambda x, y: free[x + 1][y + 1]
+
+    if not walkable(*start) or not walkable(*goal):
+        return []
+
+    if diagonal:
+        h = octile
+        successors_of = _successors_8
+    else:
+        h = _manhattan
+        successors_of = _successors_4
+
+    g_score: Dict[Coord, float] = {start: 0.0}
+    came_from: Dict[Coord, Optional[Coord]] = {start: None}
+    frontier: List[Tuple[float, Coord]] = [(h(start, goal), start)]
+    closed = set()
+
+    while frontier:
+        _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue
+        closed.add(current)
+        if stats is not None:
+            stats.expansions += 1
+        if current == goal:
+            break
+        parent = came_from[current]
+        for jp in successors_of(current, parent, goal, walkable):
+            if jp in closed:
+                continue
+            new_cost = g_score[current] + h(current, jp)
+            if new_cost < g_score.get(jp, math.inf):
+                g_score[jp] = new_cost
+                came_from[jp] = current
+                heapq.heappush(frontier, (new_cost + h(jp, goal), jp))
+
+    if goal not in came_from:
+        return []
+
+    jump_points: List[Coord] = []
+    cur: Optional[Coord] = goal
+    while cur is not None:
+        jump_points.append(cur)
+        cur = came_from[cur]
+    jump_points.reverse()
+    return _expand(jump_points)
+
+
+def _manhattan(a: Coord, b: Coord) -> float:
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def _expand(jump_points: List[Coord]) -> List[Coord]:
+    path = [jump_points[0]]
+    for (x1, y1) in jump_points[1:]:
+        x, y = path[-1]
+        dx, dy = _sign(x1 - x), _sign(y1 - y)
+        while (x, y) != (x1, y1):
+            x, y = x + dx, y + dy
+            path.append((x, y))
+    return path
+
+
+def _successors_4(
+    node: Coord, parent: Optional[Coord], goal: Coord, walkable: Callable[[int, int], bool]
+) -> List[Coord]:
+    x, y = node
+    if parent is None:
+        dirs: List[Dir] = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+    else:
+        dx, dy = _sign(x - parent[0]), _sign(y - parent[1])
+        if dx != 0:
+            dirs = [(dx, 0), (0, 1), (0, -1)]
+        else:
+            dirs = [(0, dy), (1, 0), (-1, 0)]
+    result = []
+    for dx, dy in dirs:
+        if walkable(x + dx, y + dy):
+            jp = _jump_4(x + dx, y + dy, dx, dy, goal, walkable)
+            if jp is not None:
+                result.append(jp)
+    return result
+
+
+def _jump_4(x: int, y: int, dx: int, dy: int, goal: Coord, walkable: Callable[[int, int], bool]) -> Optional[Coord]:
+    # Canonical order: vertical runs may branch horizontally at any cell,
+    # horizontal runs only stop at forced neighbours or the goal.
+    while walkable(x, y):
+        if (x, y) == goal:
+            return (x, y)
+        if dx != 0:
+            if (walkable(x, y - 1) and not walkable(x - dx, y - 1)) or (
+                walkable(x, y + 1) and not walkable(x - dx, y + 1)
+            ):
+                return (x, y)
+        else:
+            if (walkable(x - 1, y) and not walkable(x - 1, y - dy)) or (
+                walkable(x + 1, y) and not walkable(x + 1, y - dy)
+            ):
+                return (x, y)
+            for sx in (1, -1):
+                if _jump_4(x + sx, y, sx, 0, goal, walkable) is not None:
+                    return (x, y)
+        x, y = x + dx, y + dy
+    return None
+
+
+def _successors_8(
+    node: Coord, parent: Optional[Coord], goal: Coord, walkable: Callable[[int, int], bool]
+) -> List[Coord]:
+    x, y = node
+    dirs: List[Dir] = []
+    if parent is None:
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if (dx or dy) and _can_step(x, y, dx, dy, walkable):
+                    dirs.append((dx, dy))
+    else:
+        dx, dy = _sign(x - parent[0]), _sign(y - parent[1])
+        if dx != 0 and dy != 0:
+            if walkable(x, y + dy):
+                dirs.append((0, dy))
+            if walkable(x + dx, y):
+                dirs.append((dx, 0))
+            if walkable(x, y + dy) and walkable(x + dx, y):
+                dirs.append((dx, dy))
+        elif dx != 0:
+            up, down = walkable(x, y + 1), walkable(x, y - 1)
+            if walkable(x + dx, y):
+                dirs.append((dx, 0))
+                if up:
+                    dirs.append((dx, 1))
+                if down:
+                    dirs.append((dx, -1))
+            if up:
+                dirs.append((0, 1))
+            if down:
+                dirs.append((0, -1))
+        else:
+            right, left = walkable(x + 1, y), walkable(x - 1, y)
+            if walkable(x, y + dy):
+                dirs.append((0, dy))
+                if right:
+                    dirs.append((1, dy))
+                if left:
+                    dirs.append((-1, dy))
+            if right:
+                dirs.append((1, 0))
+            if left:
+                dirs.append((-1, 0))
+    result = []
+    for dx, dy in dirs:
+        jp = _jump_8(x + dx, y + dy, dx, dy, goal, walkable)
+        if jp is not None:
+            result.append(jp)
+    return result
+
+
+def _can_step(x: int, y: int, dx: int, dy: int, walkable: Callable[[int, int], bool]) -> bool:
+    if not walkable(x + dx, y + dy):
+        return False
+    if dx != 0 and dy != 0:
+        return walkable(x + dx, y) and walkable(x, y + dy)
+    return True
+
+
+def _jump_8(x: int, y: int, dx: int, dy: int, goal: Coord, walkable: Callable[[int, int], bool]) -> Optional[Coord]:
+    while walkable(x, y):
+        if (x, y) == goal:
+            return (x, y)
+        if dx != 0 and dy != 0:
+            if _jump_8(x + dx, y, dx, 0, goal, walkable) is not None or _jump_8(
+                x, y + dy, 0, dy, goal, walkable
+            ) is not None:
+                return (x, y)
+        elif dx != 0:
+            if (walkable(x, y - 1) and not walkable(x - dx, y - 1)) or (
+                walkable(x, y + 1) and not walkable(x - dx, y + 1)
+            ):
+                return (x, y)
+        else:
+            if (walkable(x - 1, y) and not walkable(x - 1, y - dy)) or (
+                walkable(x + 1, y) and not walkable(x + 1, y - dy)
+            ):
+                return (x, y)
+        # No corner cutting: a diagonal step needs both orthogonal cells free.
+        if not (walkable(x + dx, y) and walkable(x, y + dy)):
+            return None
+        x, y = x + dx, y + dy
+    return None
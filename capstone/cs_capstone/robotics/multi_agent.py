@@ -0,0 +1,264 @@
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .grid_world import UNREACHABLE, GridWorld, Coord, distance_map
+
+
+@dataclass
+class AgentPlan:
+    path: List[Coord]  # one cell per timestep; the agent stays on path[-1] afterwards
+    expansions: int = 0
+    reached: bool = True
+
+
+@dataclass
+class MultiAgentResult:
+    plans: List[AgentPlan]
+    planning_time: float
+
+    @property
+    def total_expansions(self) -> int:
+        return sum(p.expansions for p in self.plans)
+
+    @property
+    def makespan(self) -> int:
+        return max((len(p.path) - 1 for p in self.plans), default=0)
+
+
+@dataclass
+class ReservationTable:
+    vertices: Dict[Tuple[int, int], int] = field(default_factory=dict)
+    edges: Set[Tuple[int, int, int]] = field(default_factory=set)
+    parked: Dict[int, int] = field(default_factory=dict)
+    last_seen: Dict[int, int] = field(default_factory=dict)
+
+    def vertex_free(self, cell: int, t: int) -> bool:
+        parked_at = self.parked.get(cell)
+        if parked_at is not None and t >= parked_at:
+            return False
+        return (cell, t) not in self.vertices
+
+    def move_free(self, a: int, b: int, t: int) -> bool:
+        # Moving a -> b between t and t + 1 must not swap with another agent.
+        return self.vertex_free(b, t + 1) and (b, a, t) not in self.edges
+
+    def can_park(self, cell: int, t: int) -> bool:
+        return cell not in self.parked and self.last_seen.get(cell, -1) < t
+
+    def reserve(self, cells: Sequence[int], agent: int, park: bool = True) -> None:
+        for t, cell in enumerate(cells):
+            self.vertices[(cell, t)] = agent
+            if self.last_seen.get(cell, -1) < t:
+                self.last_seen[cell] = t
+            if t > 0:
+                self.edges.add((cells[t - 1], cell, t - 1))
+        if park and cells:
+            self.parked[cells[-1]] = len(cells) - 1
+
+
+class CooperativePlanner:
+    # Cooperative A* (Silver 2005) over a space-time reservation table. Agents
+    # are planned one after another in priority order, each avoiding the cells
+    # and swaps reserved by the agents before it. With window=k the planner
+    # runs windowed HCA*: every agent plans k steps ahead, the first k // 2
+    # are executed, and all agents replan from where they stand. In full mode
+    # an agent with no conflict-free plan stays on its start cell (path [start],
+    # reached=False), and every other agent is planned around that cell.
+
+    def __init__(
+        self,
+        grid: GridWorld,
+        window: Optional[int] = None,
+        max_time: Optional[int] = None,
+        max_expansions: int = 200_000,
+    ) -> None:
+        self.grid = grid
+        self.window = window
+        self.max_time = max_time if max_time is not None else 4 * (grid.width + grid.height)
+        self.max_expansions = max_expansions
+        offsets, valid = grid.flat_neighbor_table()
+        self._moves = [(int(off), valid[k].tolist()) for k, off in enumerate(offsets)]
+        self._distances: Dict[int, np.ndarray] = {}
+
+    def plan(self, starts: Sequence[Coord], goals: Sequence[Coord]) -> MultiAgentResult:
+        t0 = time.perf_counter()
+        if self.window is None:
+            plans = self._plan_full(starts, goals)
+        else:
+            plans = self._plan_windowed(starts, goals)
+        return MultiAgentResult(plans, time.perf_counter() - t0)
+
+    def _distance(self, goal: int) -> np.ndarray:
+        # One map per distinct goal (4 bytes per cell), shared by agents.
+        h = self._distances.get(goal)
+        if h is None:
+            h = self._distances[goal] = distance_map(self.grid, self.grid.from_index(goal))
+        return h
+
+    def _plan_full(self, starts: Sequence[Coord], goals: Sequence[Coord]) -> List[AgentPlan]:
+        # A failed agent stays on its start cell for good, but agents planned
+        # before it may already pass through there. So planning restarts with
+        # every failed agent parked from t = 0 until no new agent fails; the
+        # failed set only grows, so this ends after at most len(starts) rounds.
+        starts_i = [self.grid.to_index(s) for s in starts]
+        goals_i = [self.grid.to_index(g) for g in goals]
+        failed: Set[int] = set()
+        spent = [0] * len(starts_i)
+        while True:
+            table = ReservationTable()
+            for i in failed:
+                table.reserve([starts_i[i]], i, park=True)
+            plans: List[AgentPlan] = []
+            new_failures = False
+            for i, (s, g) in enumerate(zip(starts_i, goals_i)):
+                cells: List[int] = []
+                if i not in failed:
+                    cells, expansions = self._search(s, g, table, None)
+                    spent[i] += expansions
+                    if not cells:
+                        failed.add(i)
+                        new_failures = True
+                        break
+                    table.reserve(cells, i, park=True)
+                plans.append(AgentPlan([self.grid.from_index(c) for c in cells or [s]], spent[i], bool(cells)))
+            if not new_failures:
+                return plans
+
+    def _plan_windowed(self, starts: Sequence[Coord], goals: Sequence[Coord]) -> List[AgentPlan]:
+        assert self.window is not None
+        window = max(1, self.window)
+        commit = max(1, window // 2)
+        positions = [self.grid.to_index(s) for s in starts]
+        targets = [self.grid.to_index(g) for g in goals]
+        paths = [[p] for p in positions]
+        expansions = [0] * len(starts)
+        order = list(range(len(starts)))
+        t = 0
+        while t < self.max_time and positions != targets:
+            segments = self._plan_window(positions, targets, order, window, expansions)
+            for i, cells in enumerate(segments):
+                paths[i].extend(cells[1:commit + 1])
+                positions[i] = cells[commit]
+            t += commit
+
+        plans = []
+        for i, cells in enumerate(paths):
+            # Trailing waits at the goal are not part of the plan.
+            while len(cells) > 1 and cells[-1] == targets[i] and cells[-2] == targets[i]:
+                cells.pop()
+            path = [self.grid.from_index(c) for c in cells]
+            plans.append(AgentPlan(path, expansions[i], cells[-1] == targets[i]))
+        return plans
+
+    def _plan_window(
+        self, positions: List[int], targets: List[int], order: List[int], window: int, expansions: List[int]
+    ) -> List[List[int]]:
+        # An agent that finds no conflict-free move is promoted to the front of
+        # the priority order and the window is replanned; the first agent can
+        # always stay put, so this terminates after at most one pass per agent.
+        for _ in range(len(order)):
+            table = ReservationTable()
+            segments: Dict[int, List[int]] = {}
+            for rank, i in enumerate(order):
+                cells, n = self._search(positions[i], targets[i], table, window)
+                expansions[i] += n
+                if not cells:
+                    if rank > 0:
+                        order.insert(0, order.pop(rank))
+                        break
+                    cells = [positions[i]]
+                cells = cells + [cells[-1]] * (window + 1 - len(cells))
+                table.reserve(cells, i, park=False)
+                segments[i] = cells
+            else:
+                return [segments[i] for i in range(len(order))]
+        return [segments.get(i, [positions[i]] * (window + 1)) for i in range(len(order))]
+
+    def _search(
+        self, start: int, goal: int, table: ReservationTable, horizon: Optional[int]
+    ) -> Tuple[List[int], int]:
+        if horizon is None and goal in table.parked:
+            return [], 0
+        h = self._distance(goal)
+        limit = self.max_time if horizon is None else horizon
+        # The agent cannot settle on its goal before the last reservation
+        # there has passed, which bounds f from below for every state.
+        settle = table.last_seen.get(goal, -1) + 1
+        if horizon is not None:
+            settle = min(settle, horizon)
+        came_from: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {(start, 0): None}
+        # Ties on f go to the state closest to the goal (equivalently the
+        # latest timestep), otherwise every equally short path or waiting
+        # pattern would be expanded before any of them reaches the goal.
+        h0 = int(h[start])
+        frontier: List[Tuple[int, int, int, int]] = [(max(h0, settle), h0, 0, start)]
+        expansions = 0
+
+        while frontier:
+            _, _, neg_t, cur = heapq.heappop(frontier)
+            t = -neg_t
+            expansions += 1
+            if cur == goal and (table.can_park(cur, t) if horizon is None else self._free_until(table, cur, t, horizon)):
+                break
+            if horizon is not None and t == horizon:
+                break
+            if expansions >= self.max_expansions:
+                return [], expansions
+            if t >= limit:
+                continue
+            successors = [cur]
+            for off, ok in self._moves:
+                if ok[cur]:
+                    successors.append(cur + off)
+            for nxt in successors:
+                state = (nxt, t + 1)
+                if state in came_from or not table.move_free(cur, nxt, t):
+                    continue
+                dist = int(h[nxt])
+                if dist >= UNREACHABLE:
+                    continue
+                came_from[state] = (cur, t)
+                heapq.heappush(frontier, (max(t + 1 + dist, settle), dist, -t - 1, nxt))
+        else:
+            return [], expansions
+
+        cells: List[int] = []
+        node: Optional[Tuple[int, int]] = (cur, t)
+        while node is not None:
+            cells.append(node[0])
+            node = came_from[node]
+        cells.reverse()
+        return cells, expansions
+
+    @staticmethod
+    def _free_until(table: ReservationTable, cell: int, t: int, horizon: int) -> bool:
+        return all(table.vertex_free(cell, k) for k in range(t + 1, horizon + 1))
+
+
+def find_conflicts(plans: Sequence[AgentPlan]) -> List[Tuple[int, int, int]]:
+    # Returns (agent_a, agent_b, t) for every vertex or swap conflict, treating
+    # agents as staying on their last cell once their path ends.
+    # Agents without a path are skipped; indices refer to positions in plans.
+    horizon = max((len(p.path) for p in plans), default=0)
+    at = lambda path, t: path[min(t, len(path) - 1)]
+    conflicts = []
+    for t in range(horizon):
+        seen: Dict[Coord, int] = {}
+        for i, plan in enumerate(plans):
+            if not plan.path:
+                continue
+            cell = at(plan.path, t)
+            if cell in seen:
+                conflicts.append((seen[cell], i, t))
+            seen[cell] = i
+        if t + 1 < horizon:
+            moves = {(at(p.path, t), at(p.path, t + 1)): i for i, p in enumerate(plans) if p.path}
+            for (a, b), i in moves.items():
+                j = moves.get((b, a))
+                if j is not None and a != b and i < j:
+                    conflicts.append((i, j, t))
+    return conflicts
@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+import numpy as np
+
+from .grid_world import GridWorld, Coord
+
+# RGB palette indexed by cell label: free, obstacle, path, start, goal.
+COLORS = np.array(
+    [[255, 255, 255], [0, 0, 0], [220, 30, 30], [0, 160, 0], [30, 60, 220]],
+    dtype=np.uint8,
+)
+
+
+def render_path(grid: GridWorld, path: Optional[List[Coord]] = None, scale: int = 20) -> np.ndarray:
+    # uint8 RGB image of shape (height * scale, width * scale, 3); each cell
+    # is a scale x scale block, so no plotting library is involved.
+    labels = grid.occupancy.astype(np.uint8)
+    if path:
+        xs, ys = np.asarray(path, dtype=np.int64).T
+        labels[ys, xs] = 2
+    labels[grid.start[1], grid.start[0]] = 3
+    labels[grid.goal[1], grid.goal[0]] = 4
+    if scale > 1:
+        labels = labels.repeat(scale, axis=0).repeat(scale, axis=1)
+    return COLORS[labels]
@@ -1,12 +1,33 @@
 import os
+from typing import List, Sequence, Tuple
 import cv2
 import numpy as np
 
+Box = Tuple[int, int, int, int]  # x, y, w, h
+HSVRange = Tuple[Tuple[int, int, int], Tuple[int, int, int]]
+
+# Red wraps around hue 0, so it takes two HSV ranges.
+RED_RANGES: List[HSVRange] = [((0, 120, 70), (10, 255, 255)), ((170, 120, 70), (180, 255, 255))]
+
 
 def _ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+def color_mask(bgr: np.ndarray, ranges: Sequence[HSVRange] = RED_RANGES) -> np.ndarray:
+    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, np.array(ranges[0][0]), np.array(ranges[0][1]))
+    for lower, upper in ranges[1:]:
+        mask |= cv2.inRange(hsv, np.array(lower), np.array(upper))
+    return mask
+
+
+def detect_boxes(bgr: np.ndarray, ranges: Sequence[HSVRange] = RED_RANGES, min_area: int = 0) -> List[Box]:
+    contours, _ = cv2.findContours(color_mask(bgr, ranges), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = [cv2.boundingRect(cnt) for cnt in contours]
+    return [b for b in boxes if b[2] * b[3] >= min_area]
+
+
 def run_demo(output_dir: str = "artifacts") -> str:
     _ensure_dir(output_dir)
 
@@ -15,17 +36,8 @@ def run_demo(output_dir: str = "artifacts") -> str:
     cv2.circle(img, (100, 300), 40, (255, 0, 0), -1)  # BGR
     cv2.rectangle(img, (100, 100), (300, 300), (0, 0, 255), -1)
 
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-    lower1 = np.array([0, 120, 70])
-    upper1 = np.array([10, 255, 255])
-    lower2 = np.array([170, 120, 70])
-    upper2 = np.array([180, 255, 255])
-    mask = cv2.inRange(hsv, lower1, upper1) | cv2.inRange(hsv, lower2, upper2)
-
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     annotated = img.copy()
-    for cnt in contours:
-        x, y, w, h = cv2.boundingRect(cnt)
+    for x, y, w, h in detect_boxes(img):
         cv2.rectangle(annotated, (x, y), (x + w, y + h), (0, 255, 0), 2)
         cv2.putText(annotated, "red", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2, cv2.LINE_AA)
 
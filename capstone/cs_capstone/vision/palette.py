@@ -0,0 +1,74 @@
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .color_detect import Box, HSVRange, RED_RANGES
+
+DEFAULT_PALETTE: Dict[str, List[HSVRange]] = {
+    "red": RED_RANGES,
+    "yellow": [((20, 120, 100), (35, 255, 255))],
+    "green": [((40, 80, 60), (85, 255, 255))],
+    "blue": [((100, 120, 60), (130, 255, 255))],
+}
+
+
+class PaletteDetector:
+    # Classifies every pixel against a palette of named HSV ranges with a
+    # single lookup in a BGR -> label table, so a frame costs the same no
+    # matter how many colors there are. The table is built once from the
+    # HSV of each quantized BGR color (bits per channel, 8 = exact). Label 0
+    # is background, label i + 1 the i-th palette color; where ranges overlap
+    # the earlier color wins.
+
+    def __init__(self, palette: Mapping[str, Sequence[HSVRange]] = DEFAULT_PALETTE, bits: int = 6, min_area: int = 0):
+        if not 1 <= bits <= 8:
+            raise ValueError("bits must be between 1 and 8")
+        if len(palette) > 254:
+            raise ValueError("at most 254 colors fit in a uint8 label image")
+        self.names = list(palette)
+        self.min_area = min_area
+        shift = 8 - bits
+        levels = 1 << bits
+        self._quantize = (np.arange(256) >> shift).astype(np.uint8) if shift else None
+
+        q = np.arange(levels)
+        qb, qg, qr = (a.ravel() for a in np.meshgrid(q, q, q, indexing="ij"))
+        centers = (np.stack([qb, qg, qr], axis=-1) << shift) + ((1 << shift) >> 1)
+        hsv = cv2.cvtColor(centers.astype(np.uint8).reshape(-1, 1, 3), cv2.COLOR_BGR2HSV)
+        labels = np.zeros(len(centers), dtype=np.uint8)
+        for label in range(len(self.names), 0, -1):
+            for lower, upper in palette[self.names[label - 1]]:
+                labels[cv2.inRange(hsv, np.array(lower), np.array(upper)).ravel() > 0] = label
+        # Indexed by the quantized pixel's bytes read as one little-endian
+        # integer (b + g << 8 + r << 16), so classify() needs no index math;
+        # 2 ** (16 + bits) bytes, i.e. 4 MB for 6 bits.
+        self.lut = np.zeros(1 << (16 + bits), dtype=np.uint8)
+        self.lut[qb + (qg << 8) + (qr << 16)] = labels
+
+    def classify(self, bgr: np.ndarray) -> np.ndarray:
+        q = cv2.LUT(bgr, self._quantize) if self._quantize is not None else bgr
+        idx = cv2.cvtColor(q, cv2.COLOR_BGR2BGRA).view("<u4")[..., 0]
+        np.bitwise_and(idx, 0xFFFFFF, out=idx)  # drop the alpha byte
+        return np.take(self.lut, idx)
+
+    def detect(self, bgr: np.ndarray) -> Tuple[np.ndarray, Dict[str, List[np.ndarray]]]:
+        labels = self.classify(bgr)
+        contours: Dict[str, List[np.ndarray]] = {}
+        present = np.bincount(labels.ravel(), minlength=len(self.names) + 1)
+        for label, name in enumerate(self.names, start=1):
+            if not present[label]:
+                contours[name] = []
+                continue
+            mask = (labels == label).view(np.uint8)
+            found, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            contours[name] = list(found)
+        return labels, contours
+
+    def detect_boxes(self, bgr: np.ndarray) -> Dict[str, List[Box]]:
+        _, contours = self.detect(bgr)
+        result: Dict[str, List[Box]] = {}
+        for name, found in contours.items():
+            boxes = [cv2.boundingRect(c) for c in found]
+            result[name] = [b for b in boxes if b[2] * b[3] >= self.min_area]
+        return result
@@ -0,0 +1,139 @@
+import glob
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from .color_detect import Box, HSVRange, RED_RANGES, detect_boxes
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+
+@dataclass
+class FrameResult:
+    index: int
+    boxes: List[Box]
+    full_frame: bool  # False when only the regions around the last boxes were searched
+
+
+@dataclass
+class StreamStats:
+    frames: int = 0
+    full_frames: int = 0
+    elapsed: float = 0.0  # detection time only, excluding frame decoding
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def iter_frames(source: Union[str, int]) -> Iterator[np.ndarray]:
+    # A directory or glob pattern is read as a sorted image sequence;
+    # anything else (video file, camera index) goes to cv2.VideoCapture.
+    if isinstance(source, str) and (os.path.isdir(source) or any(c in source for c in "*?[")):
+        pattern = os.path.join(source, "*") if os.path.isdir(source) else source
+        for path in sorted(glob.glob(pattern)):
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                frame = cv2.imread(path, cv2.IMREAD_COLOR)
+                if frame is not None:
+                    yield frame
+        return
+    cap = cv2.VideoCapture(source)
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+class ColorTracker:
+    # Color detection over a frame stream. After a full-frame detection only
+    # the regions around the previous boxes (grown by `margin` pixels) are
+    # converted to HSV and thresholded. The whole frame is searched again
+    # every `reacquire_every` frames, when a region loses its object, or
+    # when an object reaches a region's edge, so new and fast-moving objects
+    # are picked up.
+
+    def __init__(
+        self,
+        ranges: Sequence[HSVRange] = RED_RANGES,
+        margin: int = 48,
+        reacquire_every: int = 30,
+        min_area: int = 25,
+    ) -> None:
+        self.ranges = ranges
+        self.margin = margin
+        self.reacquire_every = reacquire_every
+        self.min_area = min_area
+        self.stats = StreamStats()
+        self._boxes: List[Box] = []
+        self._since_full = 0
+
+    def reset(self) -> None:
+        self.stats = StreamStats()
+        self._boxes = []
+        self._since_full = 0
+
+    def update(self, frame: np.ndarray) -> FrameResult:
+        t0 = time.perf_counter()
+        boxes: Optional[List[Box]] = None
+        if self._boxes and self._since_full < self.reacquire_every:
+            boxes = self._detect_in_regions(frame)
+        full = boxes is None
+        if boxes is None:
+            boxes = detect_boxes(frame, self.ranges, self.min_area)
+            self._since_full = 0
+        self._since_full += 1
+        self._boxes = boxes
+
+        self.stats.elapsed += time.perf_counter() - t0
+        self.stats.frames += 1
+        self.stats.full_frames += int(full)
+        return FrameResult(self.stats.frames - 1, boxes, full)
+
+    def track(self, frames: Iterable[np.ndarray]) -> Iterator[FrameResult]:
+        for frame in frames:
+            yield self.update(frame)
+
+    def _detect_in_regions(self, frame: np.ndarray) -> Optional[List[Box]]:
+        fh, fw = frame.shape[:2]
+        boxes: List[Box] = []
+        for x0, y0, x1, y1 in self._regions(fw, fh):
+            found = detect_boxes(frame[y0:y1, x0:x1], self.ranges, self.min_area)
+            if not found:
+                return None
+            for x, y, w, h in found:
+                # A box cut by the region edge may continue outside it.
+                if (x == 0 and x0 > 0) or (y == 0 and y0 > 0) or (x + w == x1 - x0 and x1 < fw) or (
+                    y + h == y1 - y0 and y1 < fh
+                ):
+                    return None
+                boxes.append((x + x0, y + y0, w, h))
+        return boxes
+
+    def _regions(self, fw: int, fh: int) -> List[Tuple[int, int, int, int]]:
+        m = self.margin
+        regions = [
+            (max(0, x - m), max(0, y - m), min(fw, x + w + m), min(fh, y + h + m)) for x, y, w, h in self._boxes
+        ]
+        # Overlapping regions are merged so no object is detected twice.
+        merged: List[Tuple[int, int, int, int]] = []
+        while regions:
+            r = regions.pop()
+            i = 0
+            while i < len(merged):
+                o = merged[i]
+                if r[0] < o[2] and o[0] < r[2] and r[1] < o[3] and o[1] < r[3]:
+                    r = (min(r[0], o[0]), min(r[1], o[1]), max(r[2], o[2]), max(r[3], o[3]))
+                    merged.pop(i)
+                    i = 0
+                else:
+                    i += 1
+            merged.append(r)
+        return merged
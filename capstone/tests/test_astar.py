@@ -1,5 +1,8 @@
+import numpy as np
+import pytest
+
 from cs_capstone.robotics.grid_world import GridWorld
-from cs_capstone.robotics.astar import astar
+from cs_capstone.robotics.astar import astar, astar_flat
 
 
 def test_astar_finds_shortest_path():
@@ -9,3 +12,33 @@ def test_astar_finds_shortest_path():
     assert path[-1] == (4, 4)
     # Manhattan distance with a single vertical barrier having a gap -> still 8 steps
     assert len(path) - 1 == 8
+
+
+def test_astar_flat_matches_astar_on_random_grids():
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        occ = rng.random((12, 17)) < 0.3
+        occ[0, 0] = occ[-1, -1] = False
+        grid = GridWorld.from_numpy(occ, (0, 0), (16, 11))
+        assert grid.obstacles == {(int(x), int(y)) for y, x in zip(*np.nonzero(occ))}
+        assert astar_flat(grid) == astar(grid)
+
+
+def test_obstacle_changes_reach_every_planner():
+    grid = GridWorld(5, 1, set(), (0, 0), (4, 0))
+    grid.set_obstacle((2, 0))
+    assert grid.obstacles == {(2, 0)}
+    assert astar(grid) == [] and astar_flat(grid) == []
+
+
+def test_obstacle_set_view_and_off_grid_cells():
+    # Off-grid obstacles are ignored rather than wrapping around.
+    grid = GridWorld(5, 1, {(-1, 0), (9, 9)}, (0, 0), (4, 0))
+    assert len(grid.obstacles) == 0 and len(astar(grid)) == 5
+    grid.obstacles.add((2, 0))
+    assert (2, 0) in grid.obstacles and grid.occupancy[0, 2]
+    assert astar(grid) == [] and astar_flat(grid) == []
+    grid.obstacles.discard((2, 0))
+    assert astar_flat(grid) == astar(grid)
+    with pytest.raises(ValueError):
+        grid.set_obstacle((5, 0))
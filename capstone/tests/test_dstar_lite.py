@@ -0,0 +1,41 @@
+import numpy as np
+
+from cs_capstone.robotics.grid_world import GridWorld
+from cs_capstone.robotics.astar import astar, SearchStats
+from cs_capstone.robotics.dstar_lite import DStarLite
+
+
+def test_dstar_lite_replans_like_astar_from_scratch():
+    rng = np.random.default_rng(9)
+    occ = rng.random((20, 20)) < 0.2
+    occ[0, 0] = occ[-1, -1] = False
+    grid = GridWorld.from_numpy(occ, (0, 0), (19, 19))
+    planner = DStarLite(grid)
+
+    first = SearchStats()
+    path = planner.plan(first)
+    assert len(path) == len(astar(grid))
+
+    for _ in range(8):
+        if len(path) < 4:
+            break
+        planner.move_start(path[1])
+        planner.add_obstacle(path[len(path) // 2])
+        repair = SearchStats()
+        path = planner.plan(repair)
+        ref = astar(grid, planner.start, grid.goal)
+        assert len(path) == len(ref)
+        assert repair.expansions < first.expansions
+        assert all(grid.passable(p) for p in path)
+
+
+def test_dstar_lite_remove_obstacle_reopens_shortcut():
+    wall = {(2, y) for y in range(5)}
+    grid = GridWorld(5, 6, set(wall), (0, 0), (4, 0))
+    planner = DStarLite(grid)
+    assert len(planner.plan()) - 1 == 14
+    planner.remove_obstacle((2, 0))
+    assert len(planner.plan()) - 1 == 4
+    planner.add_obstacle((2, 5))
+    planner.add_obstacle((2, 0))
+    assert planner.plan() == []
@@ -0,0 +1,42 @@
+import numpy as np
+
+from cs_capstone.robotics.grid_world import GridWorld
+from cs_capstone.robotics.astar import astar
+from cs_capstone.robotics.hpa import HierarchicalPlanner
+
+
+def _random_grid(rng, width=40, height=30, density=0.2):
+    occ = rng.random((height, width)) < density
+    occ[0, 0] = occ[-1, -1] = False
+    return GridWorld.from_numpy(occ, (0, 0), (width - 1, height - 1))
+
+
+def test_hpa_returns_valid_path_when_astar_does():
+    rng = np.random.default_rng(5)
+    for _ in range(20):
+        grid = _random_grid(rng)
+        planner = HierarchicalPlanner(grid, cluster_size=8)
+        ref = astar(grid)
+        path = planner.plan()
+        assert bool(path) == bool(ref)
+        if path:
+            assert path[0] == grid.start and path[-1] == grid.goal
+            for a, b in zip(path, path[1:]):
+                assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+                assert grid.passable(b)
+            assert len(path) >= len(ref)
+
+
+def test_hpa_local_update_matches_full_rebuild():
+    rng = np.random.default_rng(6)
+    grid = _random_grid(rng)
+    planner = HierarchicalPlanner(grid, cluster_size=8)
+    for x, y in [(7, 3), (8, 3), (20, 15), (39, 10)]:
+        planner.set_obstacle((x, y))
+    planner.set_obstacle((8, 3), blocked=False)
+
+    fresh = HierarchicalPlanner(grid, cluster_size=8)
+    assert planner._borders == fresh._borders
+    assert planner._inter == fresh._inter
+    assert planner._intra == fresh._intra
+    assert planner.plan() == fresh.plan()
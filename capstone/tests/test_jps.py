@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+
+from cs_capstone.robotics.grid_world import GridWorld
+from cs_capstone.robotics.astar import astar, SearchStats
+from cs_capstone.robotics.jps import jps
+
+
+def _path_cost(path):
+    return sum(math.sqrt(2.0) if a[0] != b[0] and a[1] != b[1] else 1.0 for a, b in zip(path, path[1:]))
+
+
+def test_jps_matches_astar_length_with_fewer_expansions():
+    rng = np.random.default_rng(11)
+    for _ in range(100):
+        occ = rng.random((15, 20)) < 0.25
+        occ[0, 0] = occ[-1, -1] = False
+        grid = GridWorld.from_numpy(occ, (0, 0), (19, 14))
+        ref = astar(grid)
+        path = jps(grid)
+        assert len(path) == len(ref)
+        for a, b in zip(path, path[1:]):
+            assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+            assert grid.passable(b)
+
+    open_grid = GridWorld(50, 50, set(), (0, 0), (49, 49))
+    a_stats, j_stats = SearchStats(), SearchStats()
+    astar(open_grid, stats=a_stats)
+    assert len(jps(open_grid, stats=j_stats)) == 99
+    assert j_stats.expansions < a_stats.expansions // 10
+
+
+def test_jps_diagonal_does_not_cut_corners():
+    grid = GridWorld(3, 3, {(1, 0), (0, 1)}, (0, 0), (2, 2))
+    assert jps(grid, diagonal=True) == []
+
+    grid = GridWorld(10, 10, {(5, y) for y in range(9)}, (0, 0), (9, 0))
+    path = jps(grid, diagonal=True)
+    assert path[0] == (0, 0) and path[-1] == (9, 0)
+    # (0, 0) -> (4, 9) -> (6, 9) -> (9, 0) around the gap at (5, 9)
+    assert math.isclose(_path_cost(path), 13 + 7 * math.sqrt(2.0))
@@ -0,0 +1,64 @@
+import numpy as np
+
+from cs_capstone.robotics.grid_world import GridWorld
+from cs_capstone.robotics.astar import astar
+from cs_capstone.robotics.multi_agent import AgentPlan, CooperativePlanner, find_conflicts
+
+
+def _scenario(seed, n_agents, size=30, density=0.15):
+    rng = np.random.default_rng(seed)
+    occ = rng.random((size, size)) < density
+    free = np.argwhere(~occ)
+    idx = rng.choice(len(free), 2 * n_agents, replace=False)
+    cells = [(int(x), int(y)) for y, x in free[idx]]
+    return GridWorld.from_numpy(occ, cells[0], cells[1]), cells[:n_agents], cells[n_agents:]
+
+
+def test_cooperative_plans_are_conflict_free():
+    for window in (None, 8):
+        grid, starts, goals = _scenario(3, 25)
+        result = CooperativePlanner(grid, window=window).plan(starts, goals)
+        assert not find_conflicts(result.plans)
+        assert result.planning_time > 0
+        assert result.total_expansions == sum(p.expansions for p in result.plans)
+        for plan, s, g in zip(result.plans, starts, goals):
+            if not astar(grid, s, g):
+                continue
+            assert plan.reached
+            assert plan.path[0] == s and plan.path[-1] == g
+            for a, b in zip(plan.path, plan.path[1:]):
+                assert abs(a[0] - b[0]) + abs(a[1] - b[1]) <= 1
+                assert grid.passable(b)
+
+
+def test_head_on_agents_in_corridor_do_not_swap():
+    # A one-cell corridor with a single passing bay at x = 4.
+    obstacles = {(x, 1) for x in range(7) if x != 4}
+    grid = GridWorld(7, 2, obstacles, (0, 0), (6, 0))
+    result = CooperativePlanner(grid).plan([(0, 0), (6, 0)], [(6, 0), (0, 0)])
+    assert all(p.reached for p in result.plans)
+    assert not find_conflicts(result.plans)
+    assert (4, 1) in result.plans[1].path
+
+
+def test_failed_agent_blocks_its_start_and_conflicts_keep_agent_indices():
+    grid = GridWorld(5, 3, {(4, 1), (3, 2)}, (0, 0), (0, 0))
+    result = CooperativePlanner(grid).plan([(2, 1), (0, 1)], [(4, 2), (4, 0)])
+    assert result.plans[0].path == [(2, 1)] and not result.plans[0].reached
+    assert (2, 1) not in result.plans[1].path and result.plans[1].reached
+
+    plans = [AgentPlan([]), AgentPlan([(0, 0), (1, 0)]), AgentPlan([(1, 0), (0, 0)])]
+    assert find_conflicts(plans) == [(1, 2, 0)]
+
+
+def test_failed_agents_in_a_crowd_stay_conflict_free():
+    # 30 agents on a small map: some cannot reach their goals, and earlier
+    # agents must not be routed through the cells where those stay.
+    for seed in (1, 10, 14, 18):
+        grid, starts, goals = _scenario(seed, 30, size=20, density=0.2)
+        result = CooperativePlanner(grid).plan(starts, goals)
+        assert any(not p.reached for p in result.plans)
+        assert find_conflicts(result.plans) == []
+        for plan, s in zip(result.plans, starts):
+            if not plan.reached:
+                assert plan.path == [s]
@@ -0,0 +1,28 @@
+import cv2
+import numpy as np
+
+from cs_capstone.vision.color_detect import color_mask
+from cs_capstone.vision.palette import DEFAULT_PALETTE, PaletteDetector
+
+
+def test_palette_detector_labels_and_boxes():
+    img = np.zeros((200, 300, 3), dtype=np.uint8)
+    cv2.rectangle(img, (10, 10), (60, 50), (0, 0, 255), -1)  # red
+    cv2.rectangle(img, (100, 20), (140, 90), (0, 255, 0), -1)  # green
+    cv2.circle(img, (220, 140), 30, (255, 0, 0), -1)  # blue
+    detector = PaletteDetector()
+    labels, contours = detector.detect(img)
+    assert labels.shape == img.shape[:2] and labels.dtype == np.uint8
+    assert labels[30, 30] == 1 and labels[50, 120] == 3 and labels[140, 220] == 4 and labels[190, 10] == 0
+    assert contours["yellow"] == []
+    boxes = detector.detect_boxes(img)
+    assert boxes["red"] == [(10, 10, 51, 41)]
+    assert boxes["green"] == [(100, 20, 41, 71)]
+    assert len(boxes["blue"]) == 1
+
+
+def test_exact_table_matches_in_range():
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    detector = PaletteDetector({"red": DEFAULT_PALETTE["red"]}, bits=8)
+    assert np.array_equal(detector.classify(img) == 1, color_mask(img) > 0)
@@ -1,6 +1,8 @@
+import numpy as np
+
 from cs_capstone.robotics.grid_world import GridWorld
 from cs_capstone.robotics.astar import astar
-from cs_capstone.ml.q_learning import GridWorldEnv, QLearningAgent
+from cs_capstone.ml.q_learning import EarlyStopping, GridWorldEnv, QLearningAgent, VectorGridWorldEnv
 
 
 def test_q_learning_learns_reasonable_policy():
@@ -18,3 +20,65 @@ def test_q_learning_learns_reasonable_policy():
     assert path[-1] == grid.goal
     # Allow some slack over optimal
     assert (len(path) - 1) <= (optimal_len + 4)
+
+
+def test_vector_env_matches_scalar_env():
+    grid = GridWorld(5, 5, {(x, 2) for x in range(5) if x != 2}, (0, 0), (4, 4))
+    env = GridWorldEnv(grid, max_steps=7)
+    venv = VectorGridWorldEnv(grid, num_envs=3, max_steps=7)
+    rng = np.random.default_rng(0)
+    scalar_envs = [env] + [GridWorldEnv(grid, max_steps=7) for _ in range(2)]
+    for _ in range(40):
+        actions = rng.integers(0, 4, 3)
+        states, rewards, dones, _ = venv.step(actions)
+        for i, e in enumerate(scalar_envs):
+            s, r, done, _ = e.step(int(actions[i]))
+            assert tuple(states[i]) == s and rewards[i] == r and dones[i] == done
+            if done:
+                e.reset()
+            assert tuple(venv.states[i]) == e.state
+
+
+def test_vectorized_training_learns_path():
+    grid = GridWorld(5, 5, {(x, 2) for x in range(5) if x != 2}, (0, 0), (4, 4))
+    env = GridWorldEnv(grid, max_steps=200, seed=123)
+    agent = QLearningAgent(env, alpha=0.5, gamma=0.95, epsilon=0.1, seed=123)
+    agent.train_vectorized(VectorGridWorldEnv(grid, num_envs=32, max_steps=200), steps=300)
+    path = agent.derive_greedy_path(start=grid.start, max_steps=100)
+    assert path[-1] == grid.goal
+    assert len(path) - 1 <= len(astar(grid)) - 1 + 4
+
+
+def test_encoded_env_learns_same_policy():
+    grid = GridWorld(6, 5, {(x, 2) for x in range(6) if x != 3}, (0, 0), (5, 4))
+    results = []
+    for encoded in (False, True):
+        env = GridWorldEnv(grid, max_steps=200, seed=123, encoded=encoded)
+        agent = QLearningAgent(env, alpha=0.5, gamma=0.95, epsilon=0.1, seed=123)
+        agent.train(episodes=300, max_steps_per_episode=200)
+        results.append((agent.Q.copy(), agent.derive_greedy_path(max_steps=100)))
+    assert np.array_equal(results[0][0], results[1][0])
+    assert results[0][1] == results[1][1]
+    assert results[1][1][-1] == grid.goal
+
+
+def test_train_reports_history_and_stops_early():
+    grid = GridWorld(5, 5, {(x, 2) for x in range(5) if x != 2}, (0, 0), (4, 4))
+    env = GridWorldEnv(grid, max_steps=200, seed=123)
+    agent = QLearningAgent(env, alpha=0.5, gamma=0.95, epsilon=0.1, seed=123)
+    seen = []
+    agent.train(
+        episodes=800,
+        max_steps_per_episode=200,
+        callback=seen.append,
+        early_stopping=EarlyStopping(stable_path_checks=5, check_every=10),
+    )
+    assert seen == agent.history
+    assert 50 <= len(agent.history) < 800
+    last = agent.history[-1]
+    assert last.path_length == 8
+    assert last.steps >= 8 and last.max_td_error >= 0.0
+
+    agent = QLearningAgent(env, alpha=0.5, gamma=0.95, epsilon=0.1, seed=123)
+    agent.train(episodes=3, callback=lambda stats: stats.episode == 1)
+    assert len(agent.history) == 2
@@ -0,0 +1,63 @@
+import numpy as np
+
+from cs_capstone.robotics.grid_world import GridWorld
+from cs_capstone.ml.q_learning import GridWorldEnv, QLearningAgent
+from cs_capstone.ml.q_tables import DenseQTable, MemmapQTable, ReachableQTable
+
+
+def _grid() -> GridWorld:
+    # Columns x >= 6 are walled off from the start.
+    obstacles = {(x, 2) for x in range(5) if x != 2} | {(5, y) for y in range(5)}
+    return GridWorld(8, 5, obstacles, (0, 0), (4, 4))
+
+
+def _train(table=None, encoded=False) -> QLearningAgent:
+    env = GridWorldEnv(_grid(), max_steps=200, seed=123, encoded=encoded)
+    agent = QLearningAgent(env, alpha=0.5, gamma=0.95, epsilon=0.1, seed=123, table=table)
+    agent.train(episodes=300, max_steps_per_episode=200)
+    return agent
+
+
+def test_backends_learn_the_same_policy():
+    grid = _grid()
+    dense = _train()
+    reachable = _train(ReachableQTable(grid), encoded=True)
+    half = _train(DenseQTable(grid.width * grid.height, dtype=np.float16))
+    assert np.array_equal(dense.Q, reachable.Q)
+    assert reachable.table.nbytes < dense.table.nbytes
+    assert half.table.nbytes * 2 == dense.table.nbytes
+    path = dense.derive_greedy_path(max_steps=100)
+    assert path[-1] == grid.goal
+    assert reachable.derive_greedy_path(max_steps=100) == path
+    assert half.derive_greedy_path(max_steps=100)[-1] == grid.goal
+
+
+def test_memmap_table_resumes_from_checkpoint(tmp_path):
+    grid = _grid()
+    path = str(tmp_path / "q.npy")
+    agent = _train(MemmapQTable(path, grid.width * grid.height))
+    agent.table.flush()
+    resumed = MemmapQTable(path, grid.width * grid.height)
+    assert np.array_equal(resumed.to_dense(), agent.table.to_dense())
+    assert resumed.to_dense().any()
+
+
+def test_reachable_table_is_smaller_than_dense_on_random_maps():
+    rng = np.random.default_rng(5)
+    for density in (0.1, 0.2):
+        occ = rng.random((120, 150)) < density
+        occ[0, 0] = False
+        grid = GridWorld.from_numpy(occ, (0, 0), (149, 119))
+        table = ReachableQTable(grid)
+        dense = DenseQTable(grid.width * grid.height)
+        assert table.nbytes < dense.nbytes
+        assert grid._flat_table is None  # the BFS neighbor table is not kept
+
+        values = rng.random(dense.data.shape).astype(np.float32)
+        table.load(values)
+        cells = table.cells
+        assert np.array_equal(table.to_dense()[cells], values[cells])
+        states = rng.integers(0, grid.width * grid.height, 500)
+        expected = np.where(np.isin(states, cells), values[states].T, 0).T
+        assert np.array_equal(table.rows(states), expected)
+        assert all(np.array_equal(table.row(int(s)), e) for s, e in zip(states, expected))
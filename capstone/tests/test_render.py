@@ -0,0 +1,17 @@
+import numpy as np
+
+from cs_capstone.robotics.grid_world import GridWorld
+from cs_capstone.robotics.astar import astar
+from cs_capstone.robotics.render import COLORS, render_path
+
+
+def test_render_path_colors_cells():
+    grid = GridWorld(5, 4, {(2, 1)}, (0, 0), (4, 3))
+    path = astar(grid)
+    img = render_path(grid, path, scale=3)
+    assert img.shape == (12, 15, 3) and img.dtype == np.uint8
+    cell = lambda p: img[p[1] * 3 + 1, p[0] * 3 + 1]
+    assert (cell((2, 1)) == COLORS[1]).all()
+    assert (cell(grid.start) == COLORS[3]).all()
+    assert (cell(grid.goal) == COLORS[4]).all()
+    assert (cell(path[1]) == COLORS[2]).all()
@@ -0,0 +1,20 @@
+import numpy as np
+
+from cs_capstone.robotics.grid_world import GridWorld
+from cs_capstone.ml.q_learning import GridWorldEnv, QLearningAgent
+from cs_capstone.ml.sweep import format_results, run_sweep, sweep_configs
+
+
+def test_sweep_matches_sequential_training():
+    grid = GridWorld(5, 5, {(x, 2) for x in range(5) if x != 2}, (0, 0), (4, 4))
+    configs = sweep_configs(alphas=[0.2, 0.5], episodes=[100], seeds=[1, 2])
+    results = run_sweep(grid, configs, workers=2)
+    assert [r.config for r in results] == configs
+    for r in results:
+        c = r.config
+        env = GridWorldEnv(grid, max_steps=c.max_steps_per_episode, seed=c.seed)
+        agent = QLearningAgent(env, c.alpha, c.gamma, c.epsilon, c.seed)
+        agent.train(c.episodes, c.max_steps_per_episode)
+        assert np.array_equal(r.Q, agent.Q)
+        assert r.path_length == 8
+    assert len(format_results(results).splitlines()) == len(configs) + 1
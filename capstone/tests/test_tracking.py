@@ -0,0 +1,35 @@
+import cv2
+import numpy as np
+
+from cs_capstone.vision.color_detect import detect_boxes
+from cs_capstone.vision.tracking import ColorTracker, iter_frames
+
+
+def _frames(n: int):
+    for i in range(n):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        cv2.rectangle(frame, (10 + 4 * i, 20 + 2 * i), (40 + 4 * i, 50 + 2 * i), (0, 0, 255), -1)
+        if i >= 12:
+            # Appears later, far from the first object: found on reacquisition.
+            cv2.circle(frame, (280, 200), 12, (0, 0, 255), -1)
+        yield frame
+
+
+def test_tracker_matches_full_frame_detection():
+    tracker = ColorTracker(margin=16, reacquire_every=10)
+    frames = list(_frames(25))
+    results = list(tracker.track(frames))
+    for frame, result in zip(frames, results):
+        expected = sorted(detect_boxes(frame, min_area=tracker.min_area))
+        if result.index < 12 or result.index >= 20:
+            assert sorted(result.boxes) == expected
+    assert len(results[20].boxes) == 2 and results[20].full_frame
+    assert tracker.stats.frames == 25
+    assert tracker.stats.full_frames < 5
+
+
+def test_iter_frames_reads_image_sequence(tmp_path):
+    for i, frame in enumerate(_frames(3)):
+        cv2.imwrite(str(tmp_path / f"f{i:03d}.png"), frame)
+    frames = list(iter_frames(str(tmp_path)))
+    assert len(frames) == 3 and frames[0].shape == (240, 320, 3)
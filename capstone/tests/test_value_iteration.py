@@ -0,0 +1,24 @@
+import numpy as np
+
+from cs_capstone.robotics.grid_world import GridWorld
+from cs_capstone.robotics.astar import astar
+from cs_capstone.ml.q_learning import GridWorldEnv, QLearningAgent
+from cs_capstone.ml.value_iteration import value_iteration
+
+
+def test_value_iteration_gives_optimal_policy():
+    grid = GridWorld(5, 5, {(x, 2) for x in range(5) if x != 2}, (0, 0), (4, 4))
+    env = GridWorldEnv(grid, max_steps=200)
+    q_star = value_iteration(env, gamma=0.95)
+    assert q_star.shape == (5, 5, 4)
+
+    agent = QLearningAgent(env, gamma=0.95, epsilon=0.0)
+    agent.warm_start(q_star)
+    path = agent.derive_greedy_path(max_steps=100)
+    assert path[-1] == grid.goal
+    assert len(path) == len(astar(grid))
+
+    # Q* is a fixed point of the Q-learning update.
+    before = agent.Q.copy()
+    agent.train(episodes=20, max_steps_per_episode=50)
+    assert np.allclose(agent.Q, before, atol=1e-3)
@@ -1,14 +1,52 @@
-from typing import Tuple
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+import hashlib
+import io
+import itertools
 import numpy as np
 from PIL import Image
 import cv2
 
+_source_ids = itertools.count()
+# Modes Image.reduce handles in every supported Pillow release; palette,
+# bilevel and 16/32-bit images are converted to RGB first, which the
+# pipeline does right after decoding anyway.
+_REDUCIBLE_MODES = {"L", "LA", "La", "RGB", "RGBA", "RGBa", "RGBX", "CMYK", "YCbCr"}
+
 
 def pil_to_cv(img: Image.Image) -> np.ndarray:
     arr = np.array(img.convert("RGB"))
     return cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
 
 
+def load_image(
+    source: Union[str, bytes, Image.Image],
+    min_size: Optional[Tuple[int, int]] = None,
+    reducing_gap: float = 2.0,
+) -> Image.Image:
+    # Opens an image decoded at reduced resolution when only a small version
+    # is needed: JPEGs are decoded at 1/2, 1/4 or 1/8 scale (draft mode) and
+    # other formats are box-reduced by an integer factor, in both cases
+    # keeping at least reducing_gap * min_size pixels so the final resize
+    # still has real detail to average. Without min_size this is Image.open.
+    if isinstance(source, Image.Image):
+        img = source
+    elif isinstance(source, (bytes, bytearray)):
+        img = Image.open(io.BytesIO(source))
+    else:
+        img = Image.open(source)
+    if min_size is None:
+        return img
+    need_w, need_h = (max(1, int(v * reducing_gap)) for v in min_size)
+    if img.format == "JPEG":
+        img.draft("RGB", (need_w, need_h))
+    factor = min(img.width // need_w, img.height // need_h)
+    if factor >= 2:
+        if img.mode not in _REDUCIBLE_MODES:
+            img = img.convert("RGB")
+        img = img.reduce(factor)
+    return img
+
+
 def cv_to_pil(arr: np.ndarray) -> Image.Image:
     if len(arr.shape) == 2:
         return Image.fromarray(arr)
@@ -16,36 +54,175 @@ def cv_to_pil(arr: np.ndarray) -> Image.Image:
     return Image.fromarray(rgb)
 
 
+class CVPipeline:
+    # decode -> color convert -> resize -> blur -> gray -> canny. Every stage
+    # keeps its last output keyed by its own and all upstream parameters, so
+    # a Canny slider change reruns only Canny and preprocess_image /
+    # canny_edges share the decode/resize/blur prefix. Returned arrays are the
+    # cached ones: copy before modifying them in place.
+
+    def __init__(self, decode_size: Optional[Tuple[int, int]] = None) -> None:
+        # decode_size: largest (width, height) that will be requested; the
+        # image is then decoded only as large as needed (see load_image).
+        self.decode_size = decode_size
+        self._cache: Dict[str, Tuple[Hashable, Any]] = {}
+        self._source: Union[Image.Image, bytes, None] = None
+        self._source_key: Hashable = None
+
+    def set_decode_size(self, decode_size: Optional[Tuple[int, int]]) -> None:
+        if decode_size != self.decode_size:
+            self.decode_size = decode_size
+            self._cache.clear()
+
+    def set_source(self, source: Union[Image.Image, bytes]) -> None:
+        # Encoded bytes (e.g. an upload) are keyed by content, so reruns that
+        # pass the same file skip decoding; images are keyed by identity.
+        if source is self._source:
+            return
+        if isinstance(source, (bytes, bytearray)):
+            key: Hashable = hashlib.blake2b(source, digest_size=16).hexdigest()
+        else:
+            key = ("image", next(_source_ids))
+        if key != self._source_key:
+            self._cache.clear()
+        self._source, self._source_key = source, key
+
+    def _stage(self, name: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+        hit = self._cache.get(name)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        out = compute()
+        self._cache[name] = (key, out)
+        return out
+
+    def decoded(self) -> Image.Image:
+        def decode() -> Image.Image:
+            if self._source is None:
+                raise ValueError("CVPipeline has no source; call set_source() first")
+            return load_image(self._source, self.decode_size)
+
+        return self._stage("decode", (), decode)
+
+    def rgb(self) -> np.ndarray:
+        # Resize and blur act per channel, so the chain stays in RGB and
+        # display output needs no BGR round trip.
+        return self._stage("rgb", (), lambda: np.array(self.decoded().convert("RGB")))
+
+    def resized(self, width: int, height: int) -> np.ndarray:
+        return self._stage(
+            "resize",
+            (width, height),
+            lambda: cv2.resize(self.rgb(), (width, height), interpolation=cv2.INTER_AREA),
+        )
+
+    def blurred(self, width: int, height: int, blur_ksize: int) -> np.ndarray:
+        if not (blur_ksize and blur_ksize > 1 and blur_ksize % 2 == 1):
+            return self.resized(width, height)
+        return self._stage(
+            "blur",
+            (width, height, blur_ksize),
+            lambda: cv2.GaussianBlur(self.resized(width, height), (blur_ksize, blur_ksize), 0),
+        )
+
+    def gray(self, width: int, height: int, blur_ksize: int) -> np.ndarray:
+        return self._stage(
+            "gray",
+            (width, height, blur_ksize),
+            lambda: cv2.cvtColor(self.blurred(width, height, blur_ksize), cv2.COLOR_RGB2GRAY),
+        )
+
+    def edges(self, width: int, height: int, blur_ksize: int, low_threshold: int, high_threshold: int) -> np.ndarray:
+        return self._stage(
+            "canny",
+            (width, height, blur_ksize, low_threshold, high_threshold),
+            lambda: cv2.Canny(
+                self.gray(width, height, blur_ksize), threshold1=low_threshold, threshold2=high_threshold
+            ),
+        )
+
+
+def _pipeline_for(img: Union[Image.Image, bytes], pipeline: Optional[CVPipeline]) -> CVPipeline:
+    if pipeline is None:
+        pipeline = CVPipeline()
+    pipeline.set_source(img)
+    return pipeline
+
+
 def preprocess_image(
-    img: Image.Image,
+    img: Union[Image.Image, bytes],
     width: int = 256,
     height: int = 256,
     blur_ksize: int = 3,
     grayscale: bool = False,
+    pipeline: Optional[CVPipeline] = None,
 ) -> np.ndarray:
-    cv = pil_to_cv(img)
-    cv = cv2.resize(cv, (width, height), interpolation=cv2.INTER_AREA)
-    if blur_ksize and blur_ksize > 1 and blur_ksize % 2 == 1:
-        cv = cv2.GaussianBlur(cv, (blur_ksize, blur_ksize), 0)
+    p = _pipeline_for(img, pipeline)
     if grayscale:
-        cv = cv2.cvtColor(cv, cv2.COLOR_BGR2GRAY)
-        return cv
+        return p.gray(width, height, blur_ksize)
     # return RGB for display
-    return cv2.cvtColor(cv, cv2.COLOR_BGR2RGB)
+    return p.blurred(width, height, blur_ksize)
 
 
 def canny_edges(
-    img: Image.Image,
+    img: Union[Image.Image, bytes],
     width: int = 256,
     height: int = 256,
     blur_ksize: int = 3,
     low_threshold: int = 100,
     high_threshold: int = 200,
+    pipeline: Optional[CVPipeline] = None,
+) -> np.ndarray:
+    return _pipeline_for(img, pipeline).edges(width, height, blur_ksize, low_threshold, high_threshold)
+
+
+def process_tiled(
+    src: np.ndarray,
+    fn: Callable[[np.ndarray], np.ndarray],
+    tile: int = 1024,
+    halo: int = 16,
+    out: Optional[np.ndarray] = None,
 ) -> np.ndarray:
-    cv = pil_to_cv(img)
-    cv = cv2.resize(cv, (width, height), interpolation=cv2.INTER_AREA)
-    if blur_ksize and blur_ksize > 1 and blur_ksize % 2 == 1:
-        cv = cv2.GaussianBlur(cv, (blur_ksize, blur_ksize), 0)
-    gray = cv2.cvtColor(cv, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, threshold1=low_threshold, threshold2=high_threshold)
-    return edges
+    # Applies a size-preserving fn to tile x tile blocks, each read with
+    # `halo` extra pixels on every side that are cropped off again, so only
+    # one tile's intermediates are alive at a time. src and out may be
+    # np.memmap arrays. Results equal the full-image fn whenever fn only
+    # looks `halo` pixels far; image borders are handled exactly as fn does.
+    h, w = src.shape[:2]
+    for y0 in range(0, h, tile):
+        for x0 in range(0, w, tile):
+            y1, x1 = min(y0 + tile, h), min(x0 + tile, w)
+            py0, px0 = max(0, y0 - halo), max(0, x0 - halo)
+            res = fn(src[py0:min(h, y1 + halo), px0:min(w, x1 + halo)])
+            if out is None:
+                out = np.empty((h, w) + res.shape[2:], dtype=res.dtype)
+            out[y0:y1, x0:x1] = res[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+    assert out is not None
+    return out
+
+
+def tiled_blur(bgr: np.ndarray, blur_ksize: int = 3, tile: int = 1024, out: Optional[np.ndarray] = None) -> np.ndarray:
+    return process_tiled(
+        bgr, lambda t: cv2.GaussianBlur(t, (blur_ksize, blur_ksize), 0), tile, blur_ksize // 2 + 1, out
+    )
+
+
+def tiled_canny(
+    bgr: np.ndarray,
+    blur_ksize: int = 3,
+    low_threshold: int = 100,
+    high_threshold: int = 200,
+    tile: int = 1024,
+    halo: int = 16,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    # Full-resolution canny_edges without the resize. Gradients and
+    # non-maximum suppression are exact given the halo; hysteresis only
+    # follows weak edges up to `halo` pixels beyond a tile, so rare long
+    # weak chains crossing tile borders can differ from a full-image run.
+    def edges(t: np.ndarray) -> np.ndarray:
+        if blur_ksize and blur_ksize > 1 and blur_ksize % 2 == 1:
+            t = cv2.GaussianBlur(t, (blur_ksize, blur_ksize), 0)
+        gray = cv2.cvtColor(t, cv2.COLOR_BGR2GRAY)
+        return cv2.Canny(gray, threshold1=low_threshold, threshold2=high_threshold)
+
+    return process_tiled(bgr, edges, tile, max(halo, blur_ksize // 2 + 2), out)
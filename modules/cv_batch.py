@@ -0,0 +1,218 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
+import cv2
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff"}
+STAGES = ("read", "decode", "process", "encode", "write")
+_DONE = object()
+
+
+@dataclass
+class BatchStats:
+    images: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    # Summed over all threads of a stage, so it can exceed elapsed.
+    stage_seconds: Dict[str, float] = field(default_factory=lambda: {s: 0.0 for s in STAGES})
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def images_per_sec(self) -> float:
+        return self.images / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_seconds[stage] += seconds
+
+    def fail(self) -> None:
+        with self._lock:
+            self.failed += 1
+
+    def summary(self) -> str:
+        lines = [f"{self.images} images ({self.failed} failed) in {self.elapsed:.2f}s: {self.images_per_sec:.1f} images/sec"]
+        n = max(1, self.images)
+        for stage in STAGES:
+            total = self.stage_seconds[stage]
+            lines.append(f"  {stage:<8} {total:8.2f}s total  {1000 * total / n:7.2f} ms/image")
+        return "\n".join(lines)
+
+
+def iter_images(input_dir: str) -> Iterator[str]:
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                yield os.path.join(root, name)
+
+
+def make_processor(
+    mode: str = "edges",
+    width: int = 256,
+    height: int = 256,
+    blur_ksize: int = 3,
+    low_threshold: int = 100,
+    high_threshold: int = 200,
+) -> Callable[[np.ndarray], np.ndarray]:
+    # Same steps as modules.cv.preprocess_image / canny_edges, on BGR arrays.
+    if mode not in ("preprocess", "gray", "edges"):
+        raise ValueError(f"Unknown mode: {mode}")
+    blur = bool(blur_ksize and blur_ksize > 1 and blur_ksize % 2 == 1)
+
+    def process(img: np.ndarray) -> np.ndarray:
+        img = cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+        if blur:
+            img = cv2.GaussianBlur(img, (blur_ksize, blur_ksize), 0)
+        if mode == "preprocess":
+            return img
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if mode == "gray":
+            return gray
+        return cv2.Canny(gray, threshold1=low_threshold, threshold2=high_threshold)
+
+    return process
+
+
+def process_directory(
+    input_dir: str,
+    output_dir: str,
+    process: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    fmt: str = "png",
+    quality: int = 90,
+    workers: int = 4,
+    queue_size: int = 32,
+) -> BatchStats:
+    # One reader thread feeds `workers` decode+process threads, which feed
+    # `workers` encode+write threads. Both hand-offs are bounded queues, so
+    # only about 2 * queue_size images are in flight however large the
+    # directory is. OpenCV releases the GIL in imdecode/resize/Canny/imencode,
+    # so the threads really run in parallel.
+    process = process or make_processor()
+    ext = "." + fmt.lower().lstrip(".")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if not cv2.haveImageWriter("x" + ext):
+        raise ValueError(f"OpenCV cannot write {fmt!r} images")
+    params: List[int] = []
+    if ext in (".jpg", ".jpeg"):
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    elif ext == ".webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+
+    stats = BatchStats()
+    raw: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    processed: "queue.Queue" = queue.Queue(maxsize=queue_size)
+
+    def timed(stage: str, fn: Callable, *args):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        stats.add(stage, time.perf_counter() - t0)
+        return out
+
+    def read_file(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def reader() -> None:
+        # The sentinels must go out even if the walk itself fails, or the
+        # workers would block on raw.get() forever.
+        try:
+            for path in iter_images(input_dir):
+                try:
+                    data = timed("read", read_file, path)
+                except OSError:
+                    stats.fail()
+                    continue
+                raw.put((path, data))
+        finally:
+            for _ in range(workers):
+                raw.put(_DONE)
+
+    def decode_and_process() -> None:
+        while True:
+            item = raw.get()
+            if item is _DONE:
+                return
+            path, data = item
+            try:
+                img = timed("decode", cv2.imdecode, np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if img is None:
+                    raise ValueError(f"cannot decode {path}")
+                out = timed("process", process, img)
+            except Exception:
+                # One bad file must not stop the batch (or strand a worker).
+                stats.fail()
+                continue
+            processed.put((path, out))
+
+    def encode_and_write() -> None:
+        while True:
+            item = processed.get()
+            if item is _DONE:
+                return
+            path, img = item
+            try:
+                _, buf = timed("encode", cv2.imencode, ext, img, params)
+                out = os.path.join(output_dir, os.path.splitext(os.path.relpath(path, input_dir))[0] + ext)
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                timed("write", buf.tofile, out)
+            except Exception:
+                stats.fail()
+                continue
+            with stats._lock:
+                stats.images += 1
+
+    t0 = time.perf_counter()
+    readers = [threading.Thread(target=reader, daemon=True)]
+    processors = [threading.Thread(target=decode_and_process, daemon=True) for _ in range(workers)]
+    writers = [threading.Thread(target=encode_and_write, daemon=True) for _ in range(workers)]
+    for t in readers + processors + writers:
+        t.start()
+    for t in readers + processors:
+        t.join()
+    for _ in writers:
+        processed.put(_DONE)
+    for t in writers:
+        t.join()
+    stats.elapsed = time.perf_counter() - t0
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    # Exits with status 1 if any image failed, 2 on bad arguments.
+    parser = argparse.ArgumentParser(description="Batch image preprocessing / Canny edges")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--mode", choices=["preprocess", "gray", "edges"], default="edges")
+    parser.add_argument("--format", default="png", help="png, jpg or webp")
+    parser.add_argument("--quality", type=int, default=90)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--height", type=int, default=256)
+    parser.add_argument("--blur", type=int, default=3)
+    parser.add_argument("--low", type=int, default=100)
+    parser.add_argument("--high", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--queue-size", type=int, default=32)
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if not cv2.haveImageWriter("x." + args.format.lower().lstrip(".")):
+        parser.error(f"unsupported --format {args.format!r}")
+
+    process = make_processor(args.mode, args.width, args.height, args.blur, args.low, args.high)
+    stats = process_directory(
+        args.input_dir, args.output_dir, process, args.format, args.quality, args.workers, args.queue_size
+    )
+    print(stats.summary())
+    if stats.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,577 @@
-from typing import Tuple, Dict, Any
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Tuple, Dict, Any, Iterator, List, Optional, Sequence, Union
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+import joblib
 import numpy as np
+import sklearn
 from sklearn.datasets import load_iris
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
 from sklearn.pipeline import make_pipeline, Pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import GaussianNB
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
 
 
-def get_iris_data():
+@lru_cache(maxsize=1)
+def _load_iris():
     iris = load_iris()
-    X = iris.data
-    y = iris.target
-    return X, y, iris.feature_names, iris.target_names
+    # Shared by every caller, so keep it read-only.
+    for arr in (iris.data, iris.target):
+        arr.flags.writeable = False
+    return iris.data, iris.target, iris.feature_names, iris.target_names
+
+
+def get_iris_data():
+    # Fresh writable arrays, as before the cache; internal callers use
+    # _load_iris() directly and never modify it.
+    X, y, feature_names, target_names = _load_iris()
+    return X.copy(), y.copy(), feature_names, target_names
+
+
+def data_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for arr in (X, y):
+        arr = np.ascontiguousarray(arr)
+        h.update(str((arr.dtype, arr.shape)).encode())
+        h.update(arr.data)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _iris_fingerprint() -> str:
+    X, y, _, _ = _load_iris()
+    return data_fingerprint(X, y)
+
+
+DEFAULT_PARAMS: Dict[str, Dict[str, Any]] = {
+    "Random Forest": {"n_estimators": 200, "random_state": 42},
+    "Logistic Regression": {"max_iter": 500},
+}
 
 
-def build_model(model_name: str) -> Pipeline:
+def build_model(model_name: str, params: Optional[Dict[str, Any]] = None) -> Pipeline:
+    # params override DEFAULT_PARAMS for the final estimator.
     if model_name == "Random Forest":
-        clf = RandomForestClassifier(n_estimators=200, random_state=42)
+        clf = RandomForestClassifier(**{**DEFAULT_PARAMS[model_name], **(params or {})})
     else:
-        clf = LogisticRegression(max_iter=500)
+        clf = LogisticRegression(**{**DEFAULT_PARAMS["Logistic Regression"], **(params or {})})
     pipe = make_pipeline(StandardScaler(), clf)
     return pipe
 
 
-def train_iris_model(model_name: str = "Logistic Regression", test_size: float = 0.2, random_state: int = 42):
-    X, y, feature_names, target_names = get_iris_data()
+DEFAULT_GRIDS: Dict[str, Dict[str, List[Any]]] = {
+    "Logistic Regression": {"C": [0.01, 0.1, 1.0, 10.0, 100.0]},
+    "Random Forest": {"n_estimators": [50, 100, 200], "max_depth": [None, 3, 5]},
+}
+
+
+def _scaled_folds(X: np.ndarray, y: np.ndarray, n_splits: int, random_state: int) -> List[Tuple[np.ndarray, ...]]:
+    # The scaler has no hyperparameters, so each fold is scaled once and
+    # shared by all candidates instead of refitting it inside every pipeline.
+    folds = []
+    for train_idx, test_idx in StratifiedKFold(n_splits, shuffle=True, random_state=random_state).split(X, y):
+        scaler = StandardScaler().fit(X[train_idx])
+        folds.append((scaler.transform(X[train_idx]), y[train_idx], scaler.transform(X[test_idx]), y[test_idx]))
+    return folds
+
+
+def _fit_fold(model_name: str, params: Dict[str, Any], fold: Tuple[np.ndarray, ...]) -> Tuple[float, float, float]:
+    X_train, y_train, X_test, y_test = fold
+    clf = build_model(model_name, params)[-1]
+    t0 = time.perf_counter()
+    clf.fit(X_train, y_train)
+    t1 = time.perf_counter()
+    y_pred = clf.predict(X_test)
+    t2 = time.perf_counter()
+    return accuracy_score(y_test, y_pred), t1 - t0, t2 - t1
+
+
+def cross_validated_search(
+    grids: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+    n_splits: int = 5,
+    random_state: int = 42,
+    n_jobs: int = -1,
+    X: Optional[np.ndarray] = None,
+    y: Optional[np.ndarray] = None,
+) -> List[Dict[str, Any]]:
+    # k-fold CV of every (model, params) candidate in grids (model name ->
+    # sklearn-style parameter grid), one joblib task per candidate and fold
+    # across n_jobs processes. Rows are sorted by mean accuracy; times are
+    # per fold, in seconds.
+    if X is None or y is None:
+        X, y, _, _ = _load_iris()
+    folds = _scaled_folds(np.asarray(X), np.asarray(y), n_splits, random_state)
+    candidates = [(name, params) for name, grid in (grids or DEFAULT_GRIDS).items() for params in ParameterGrid(grid)]
+    scores = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_fit_fold)(name, params, fold) for name, params in candidates for fold in folds
+    )
+    rows = []
+    for i, (name, params) in enumerate(candidates):
+        acc, fit_time, predict_time = np.array(scores[i * len(folds):(i + 1) * len(folds)]).T
+        rows.append(
+            {
+                "model": name,
+                "params": params,
+                "mean_accuracy": float(acc.mean()),
+                "std_accuracy": float(acc.std()),
+                "fit_time": float(fit_time.mean()),
+                "predict_time": float(predict_time.mean()),
+            }
+        )
+    rows.sort(key=lambda r: -r["mean_accuracy"])
+    return rows
+
+
+class ModelRegistry:
+    # Fitted pipelines and their metrics, keyed by everything that determines
+    # them. Entries live in an in-memory LRU of `maxsize` and, when a
+    # directory is given, as uncompressed joblib files there (loaded with
+    # mmap_mode="r"), so hits survive process restarts. If the directory
+    # cannot be created or written (read-only install) the registry quietly
+    # works in memory only. Hits return the stored Pipeline itself, shared
+    # by every caller and thread: use it for prediction only, never refit it
+    # or change its parameters.
+
+    def __init__(self, directory: Optional[str] = None, maxsize: int = 16) -> None:
+        self.directory = directory
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[str, Tuple[Pipeline, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError:
+                self.directory = None
+
+    @staticmethod
+    def key(
+        model_name: str, params: Optional[Dict[str, Any]], test_size: float, random_state: int, data_hash: str
+    ) -> str:
+        # Pickles from another scikit-learn release are not reliably
+        # loadable, so the version is part of the key.
+        payload = json.dumps(
+            [model_name, params or {}, float(test_size), int(random_state), data_hash, sklearn.__version__],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        assert self.directory is not None
+        return os.path.join(self.directory, f"{key}.joblib")
+
+    def get(self, key: str) -> Optional[Tuple[Pipeline, Dict[str, Any]]]:
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                self._memory.move_to_end(key)
+                return hit
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        try:
+            hit = joblib.load(self._path(key), mmap_mode="r")
+        except Exception:
+            # A truncated or incompatible file is treated as a miss.
+            return None
+        self._remember(key, hit)
+        return hit
+
+    def put(self, key: str, model: Pipeline, metrics: Dict[str, Any]) -> None:
+        self._remember(key, (model, metrics))
+        if self.directory:
+            # Streamlit sessions are threads of one process, so the temp name
+            # needs the thread as well as the process.
+            tmp = self._path(key) + f".{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                joblib.dump((model, metrics), tmp)
+                os.replace(tmp, self._path(key))
+            except OSError:
+                # Disk full or read-only: the in-memory entry still serves hits.
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".joblib"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _remember(self, key: str, entry: Tuple[Pipeline, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+
+_default_registry: Optional[ModelRegistry] = None
+
+
+def default_registry() -> ModelRegistry:
+    # On disk next to the project, or in $MODEL_REGISTRY_DIR.
+    global _default_registry
+    if _default_registry is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        _default_registry = ModelRegistry(os.environ.get("MODEL_REGISTRY_DIR", os.path.join(root, ".model_registry")))
+    return _default_registry
+
+
+def train_iris_model(
+    model_name: str = "Logistic Regression",
+    test_size: float = 0.2,
+    random_state: int = 42,
+    params: Optional[Dict[str, Any]] = None,
+    registry: Optional[ModelRegistry] = None,
+    use_cache: bool = True,
+):
+    # metrics["cached"] tells whether the model came from the registry; a
+    # cached model is shared with other callers (see ModelRegistry).
+    if use_cache and registry is None:
+        registry = default_registry()
+    key = None
+    if use_cache and registry is not None:
+        key = ModelRegistry.key(model_name, params, test_size, random_state, _iris_fingerprint())
+        hit = registry.get(key)
+        if hit is not None:
+            model, metrics = hit
+            return model, {**metrics, "cached": True}
+
+    X, y, feature_names, target_names = _load_iris()
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=test_size, random_state=random_state, stratify=y
     )
-    model = build_model(model_name)
+    model = build_model(model_name, params)
     model.fit(X_train, y_train)
     y_pred = model.predict(X_test)
     acc = accuracy_score(y_test, y_pred)
     report = classification_report(y_test, y_pred, target_names=target_names, zero_division=0)
     metrics = {"accuracy": acc, "classification_report": report, "target_names": target_names}
+    if key is not None and registry is not None:
+        registry.put(key, model, metrics)
+    return model, {**metrics, "cached": False}
+
+
+Chunk = Tuple[np.ndarray, np.ndarray]
+
+
+class ArraySource:
+    # In-memory arrays served in chunks, e.g. the Iris data for testing.
+    def __init__(self, X: np.ndarray, y: np.ndarray, chunksize: int = 100_000) -> None:
+        self.X, self.y, self.chunksize = X, y, chunksize
+
+    def __iter__(self) -> Iterator[Chunk]:
+        for i in range(0, len(self.X), self.chunksize):
+            yield np.asarray(self.X[i:i + self.chunksize], dtype=float), self.y[i:i + self.chunksize]
+
+
+class CSVSource:
+    # Streams a CSV with a header row in chunks of `chunksize` rows; only one
+    # chunk is in memory at a time. Features must be numeric, the target
+    # column is returned as strings unless target_dtype is given.
+    def __init__(
+        self,
+        path: str,
+        target: Union[str, int],
+        features: Optional[Sequence[Union[str, int]]] = None,
+        chunksize: int = 100_000,
+        delimiter: str = ",",
+        target_dtype: Any = str,
+    ) -> None:
+        self.path = path
+        self.chunksize = chunksize
+        self.delimiter = delimiter
+        self.target_dtype = target_dtype
+        with open(path, "r", encoding="utf-8") as f:
+            header = [h.strip().strip('"') for h in f.readline().rstrip("\n").split(delimiter)]
+
+        def index(column: Union[str, int]) -> int:
+            return column if isinstance(column, int) else header.index(column)
+
+        self.target_col = index(target)
+        if features is None:
+            self.feature_cols = [i for i in range(len(header)) if i != self.target_col]
+        else:
+            self.feature_cols = [index(c) for c in features]
+        self.feature_names = [header[i] for i in self.feature_cols]
+
+    def __iter__(self) -> Iterator[Chunk]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.readline()
+            while True:
+                lines = list(itertools.islice(f, self.chunksize))
+                if not lines:
+                    return
+                X = np.loadtxt(lines, delimiter=self.delimiter, usecols=self.feature_cols, ndmin=2, quotechar='"')
+                y = np.loadtxt(
+                    lines, delimiter=self.delimiter, usecols=[self.target_col], dtype=self.target_dtype, ndmin=1, quotechar='"'
+                )
+                yield X, y
+
+
+class ParquetSource:
+    # Streams record batches of a Parquet file (needs pyarrow).
+    def __init__(self, path: str, target: str, features: Optional[Sequence[str]] = None, chunksize: int = 100_000) -> None:
+        self.path, self.target, self.features, self.chunksize = path, target, features, chunksize
+
+    def __iter__(self) -> Iterator[Chunk]:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("ParquetSource needs pyarrow: pip install pyarrow") from exc
+        pf = pq.ParquetFile(self.path)
+        features = list(self.features or [n for n in pf.schema_arrow.names if n != self.target])
+        for batch in pf.iter_batches(batch_size=self.chunksize, columns=features + [self.target]):
+            X = np.column_stack([batch.column(n).to_numpy(zero_copy_only=False) for n in features]).astype(float)
+            yield X, batch.column(self.target).to_numpy(zero_copy_only=False)
+
+
+def build_streaming_model(model_name: str = "Logistic Regression", params: Optional[Dict[str, Any]] = None) -> Pipeline:
+    # Same StandardScaler + classifier shape as build_model, with estimators
+    # that support partial_fit.
+    if model_name == "Logistic Regression":
+        clf = SGDClassifier(**{"loss": "log_loss", "random_state": 42, **(params or {})})
+    elif model_name == "Naive Bayes":
+        clf = GaussianNB(**(params or {}))
+    else:
+        raise ValueError(f"{model_name} cannot be trained incrementally")
+    return make_pipeline(StandardScaler(), clf)
+
+
+def _holdout_mask(n: int, chunk_index: int, test_size: float, random_state: int) -> np.ndarray:
+    # Seeded per chunk, so every pass over the data sees the same split.
+    return np.random.default_rng([random_state, chunk_index]).random(n) < test_size
+
+
+def train_streaming(
+    source,
+    model_name: str = "Logistic Regression",
+    params: Optional[Dict[str, Any]] = None,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    epochs: int = 5,
+):
+    # Out-of-core training: one pass fits the scaler and collects the
+    # classes, then `epochs` passes partial_fit the classifier on the
+    # training rows of each chunk, and a last pass scores the holdout rows.
+    # Memory use is bounded by the chunk size, not the dataset size.
+    model = build_streaming_model(model_name, params)
+    scaler, clf = model[0], model[-1]
+    classes: set = set()
+    for i, (X, y) in enumerate(source):
+        train = ~_holdout_mask(len(X), i, test_size, random_state)
+        if train.any():
+            scaler.partial_fit(X[train])
+        classes.update(np.unique(y).tolist())
+    all_classes = np.array(sorted(classes))
+
+    for _ in range(epochs):
+        for i, (X, y) in enumerate(source):
+            train = ~_holdout_mask(len(X), i, test_size, random_state)
+            if train.any():
+                clf.partial_fit(scaler.transform(X[train]), y[train], classes=all_classes)
+
+    correct = total = rows = 0
+    for i, (X, y) in enumerate(source):
+        rows += len(X)
+        test = _holdout_mask(len(X), i, test_size, random_state)
+        if test.any():
+            correct += int((clf.predict(scaler.transform(X[test])) == y[test]).sum())
+            total += int(test.sum())
+    metrics = {"accuracy": correct / total if total else float("nan"), "holdout_rows": total, "rows": rows}
     return model, metrics
 
 
-def predict_iris(model: Pipeline, features: np.ndarray):
+def predict_batch(model: Pipeline, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Labels and class probabilities for an (N, 4) array from one
+    # predict_proba pass; labels are the argmax, as model.predict would give.
+    features = np.asarray(features, dtype=float)
     if features.ndim == 1:
         features = features.reshape(1, -1)
-    pred_idx = int(model.predict(features)[0])
-    # Extract classes from the final estimator in the pipeline
-    final_estimator = model.steps[-1][1]
-    classes = final_estimator.classes_
-    proba = model.predict_proba(features)[0]
+    proba = model.predict_proba(features)
+    classes = model.steps[-1][1].classes_
+    return classes[np.argmax(proba, axis=1)], proba
+
+
+def predict_iris(model: Pipeline, features: np.ndarray):
+    labels, proba = predict_batch(model, features)
+    classes = model.steps[-1][1].classes_
     # Map probabilities to class indices
-    label_probs = {int(cls): float(prob) for cls, prob in zip(classes, proba)}
-    return pred_idx, label_probs
+    label_probs = {int(cls): float(prob) for cls, prob in zip(classes, proba[0])}
+    return int(labels[0]), label_probs
+
+
+def _logistic_uses_ovr(clf: LogisticRegression) -> bool:
+    # Mirrors LogisticRegression.predict_proba: scikit-learn 1.3 chooses
+    # one-vs-rest from multi_class ("deprecated" means "auto" in 1.5-1.7);
+    # releases without the parameter use it only for binary problems.
+    binary = len(clf.classes_) <= 2
+    multi_class = getattr(clf, "multi_class", None)
+    if multi_class is None:
+        return binary
+    if multi_class == "deprecated":
+        multi_class = "auto"
+    return multi_class in ("ovr", "warn") or (multi_class == "auto" and (binary or clf.solver == "liblinear"))
+
+
+def export_numpy(model: Pipeline, path: str) -> None:
+    # Writes a fitted StandardScaler + classifier pipeline as plain arrays
+    # for modules.ml_infer.NumpyPredictor. Linear models get the scaler
+    # folded into one weight matrix and bias: W (x - mean) / scale + b =
+    # (W / scale) x + (b - W / scale . mean). Forests are flattened into
+    # contiguous node arrays with child indices offset per tree.
+    scaler, clf = model.steps[0][1], model.steps[-1][1]
+    if not isinstance(scaler, StandardScaler):
+        raise ValueError("expected a StandardScaler as the first pipeline step")
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(scaler.n_features_in_)
+    scale = scaler.scale_ if scaler.with_std else np.ones(scaler.n_features_in_)
+    arrays: Dict[str, np.ndarray] = {"classes": clf.classes_}
+
+    if isinstance(clf, (LogisticRegression, SGDClassifier)):
+        if isinstance(clf, SGDClassifier) and clf.loss != "log_loss":
+            raise ValueError("only SGDClassifier(loss='log_loss') has predict_proba")
+        W = clf.coef_ / scale
+        b = clf.intercept_ - W @ mean
+        multinomial = isinstance(clf, LogisticRegression) and not _logistic_uses_ovr(clf)
+        if multinomial and W.shape[0] == 1:
+            # Binary multinomial: sklearn takes softmax([-z, z]).
+            W, b = np.vstack([-W, W]), np.concatenate([-b, b])
+        arrays.update(kind=np.array("softmax" if multinomial else "ovr"), W=W, b=b)
+    elif isinstance(clf, RandomForestClassifier):
+        trees = [est.tree_ for est in clf.estimators_]
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+        value = np.concatenate([t.value[:, 0, :] for t in trees])
+        value = value / value.sum(axis=1, keepdims=True)
+        arrays.update(
+            kind=np.array("forest"),
+            mean=mean,
+            scale=scale,
+            roots=offsets[:-1].astype(np.int32),
+            feature=np.concatenate([np.maximum(t.feature, 0) for t in trees]).astype(np.int32),
+            threshold=np.concatenate([t.threshold for t in trees]),
+            left=np.concatenate([np.where(t.children_left >= 0, t.children_left + o, -1) for t, o in zip(trees, offsets)]).astype(np.int32),
+            right=np.concatenate([np.where(t.children_right >= 0, t.children_right + o, -1) for t, o in zip(trees, offsets)]).astype(np.int32),
+            value=value,
+        )
+    else:
+        raise ValueError(f"cannot export {type(clf).__name__}")
+    np.savez_compressed(path, **arrays)
+
+
+def _fail(item: Tuple[np.ndarray, "asyncio.Future", float], exc: BaseException) -> None:
+    fut = item[1]
+    if not fut.done():
+        fut.set_exception(exc)
+
+
+class MicroBatcher:
+    # Gathers concurrent single-row predict() calls into one predict_batch
+    # call. A batch closes when it has max_batch_size rows or max_latency
+    # seconds after its first request arrived, whichever comes first.
+    #
+    #     async with MicroBatcher(model) as batcher:
+    #         label, probs = await batcher.predict(row)
+
+    def __init__(self, model: Pipeline, max_batch_size: int = 64, max_latency: float = 0.002, history: int = 10000):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.batch_sizes: "deque[int]" = deque(maxlen=history)
+        self.latencies: "deque[float]" = deque(maxlen=history)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "MicroBatcher":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        # Requests that never reached a batch would otherwise wait forever.
+        while self._queue is not None and not self._queue.empty():
+            _fail(self._queue.get_nowait(), RuntimeError("MicroBatcher closed"))
+
+    async def predict(self, features: np.ndarray) -> Tuple[int, Dict[int, float]]:
+        self.start()
+        assert self._queue is not None
+        # Bad rows are rejected here so they cannot fail the whole batch.
+        row = np.asarray(features, dtype=float).ravel()
+        n_features = self.model.n_features_in_
+        if row.size != n_features:
+            raise ValueError(f"expected {n_features} features, got {row.size}")
+        if not np.isfinite(row).all():
+            raise ValueError("features must be finite")
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, fut, time.perf_counter()))
+        return await fut
+
+    def stats(self) -> Dict[str, float]:
+        sizes = np.array(self.batch_sizes, dtype=float)
+        lat = np.array(self.latencies, dtype=float) * 1000.0
+        return {
+            "requests": float(lat.size),
+            "batches": float(sizes.size),
+            "mean_batch_size": float(sizes.mean()) if sizes.size else 0.0,
+            "max_batch_size": float(sizes.max()) if sizes.size else 0.0,
+            "p50_ms": float(np.percentile(lat, 50)) if lat.size else 0.0,
+            "p99_ms": float(np.percentile(lat, 99)) if lat.size else 0.0,
+        }
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        classes = self.model.steps[-1][1].classes_
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_latency
+            try:
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                for item in batch:
+                    _fail(item, RuntimeError("MicroBatcher closed"))
+                raise
+            pending: List = [item for item in batch if not item[1].done()]
+            if not pending:
+                continue
+            try:
+                labels, proba = predict_batch(self.model, np.stack([item[0] for item in pending]))
+            except Exception as exc:
+                for item in pending:
+                    _fail(item, exc)
+                continue
+            done = time.perf_counter()
+            self.batch_sizes.append(len(pending))
+            for i, (_, fut, t0) in enumerate(pending):
+                fut.set_result((int(labels[i]), {int(c): float(p) for c, p in zip(classes, proba[i])}))
+                self.latencies.append(done - t0)
@@ -0,0 +1,63 @@
+from typing import Tuple
+import numpy as np
+
+# Inference for models exported with modules.ml.export_numpy. Only NumPy is
+# imported, so serving code can predict without loading scikit-learn.
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    z /= z.sum(axis=1, keepdims=True)
+    return z
+
+
+class NumpyPredictor:
+    def __init__(self, arrays: dict) -> None:
+        self.kind = str(arrays["kind"])
+        self.classes = arrays["classes"]
+        self._a = arrays
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyPredictor":
+        with np.load(path, allow_pickle=False) as f:
+            return cls({k: f[k] for k in f.files})
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        X = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        a = self._a
+        if self.kind == "softmax":
+            return _softmax(X @ a["W"].T + a["b"])
+        if self.kind == "ovr":
+            p = 1.0 / (1.0 + np.exp(-(X @ a["W"].T + a["b"])))
+            if p.shape[1] == 1:
+                return np.hstack([1.0 - p, p])
+            return p / p.sum(axis=1, keepdims=True)
+        if self.kind == "forest":
+            return self._forest_proba(X)
+        raise ValueError(f"Unknown model kind: {self.kind}")
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return self.classes[np.argmax(self.predict_proba(features), axis=1)]
+
+    def predict_batch(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        proba = self.predict_proba(features)
+        return self.classes[np.argmax(proba, axis=1)], proba
+
+    def _forest_proba(self, X: np.ndarray) -> np.ndarray:
+        a = self._a
+        # Trees compare float32 features, like sklearn's tree predict.
+        Z = ((X - a["mean"]) / a["scale"]).astype(np.float32)
+        feature, threshold, left, right = a["feature"], a["threshold"], a["left"], a["right"]
+        rows = np.repeat(np.arange(len(Z)), len(a["roots"]))
+        nodes = np.tile(a["roots"], len(Z))
+        # Every (sample, tree) pair descends one level per iteration until all
+        # have reached a leaf (left == -1).
+        active = np.flatnonzero(left[nodes] >= 0)
+        while len(active):
+            n = nodes[active]
+            go_left = Z[rows[active], feature[n]] <= threshold[n]
+            nodes[active] = np.where(go_left, left[n], right[n])
+            active = active[left[nodes[active]] >= 0]
+        leaf_proba = a["value"][nodes].reshape(len(Z), len(a["roots"]), -1)
+        return leaf_proba.mean(axis=1)
@@ -1,10 +1,30 @@
-from typing import List, Tuple, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple, Optional
+import hashlib
+import math
 import random
 import heapq
+import time
 import numpy as np
-import matplotlib.pyplot as plt
 
 Coord = Tuple[int, int]
+SQRT2 = math.sqrt(2.0)
+
+
+@dataclass
+class SearchStats:
+    expansions: int = 0
+
+
+@dataclass
+class AnytimeResult:
+    path: Optional[List[Coord]]
+    cost: float
+    bound: float  # path cost is at most bound * optimal cost
+    epsilon: float
+    expansions: int
+    elapsed: float
 
 
 def generate_grid(rows: int, cols: int, obstacle_prob: float = 0.2, seed: int = 42) -> np.ndarray:
@@ -17,6 +37,43 @@ def generate_grid(rows: int, cols: int, obstacle_prob: float = 0.2, seed: int =
     return grid
 
 
+def generate_large_grid(
+    rows: int,
+    cols: int,
+    obstacle_prob: float = 0.2,
+    seed: int = 42,
+    path: Optional[str] = None,
+    chunk_rows: int = 1024,
+) -> np.ndarray:
+    # Vectorized counterpart of generate_grid for very large maps. Every row
+    # draws from its own generator seeded with (seed, row), so the result only
+    # depends on the seed and never on chunk_rows. With a path the grid is
+    # written chunk by chunk into a memory-mapped .npy file instead of RAM.
+    # SeedSequence only takes non-negative entropy, so negative seeds are
+    # mapped to their two's complement 64-bit value.
+    if seed < 0:
+        seed &= 0xFFFFFFFFFFFFFFFF
+    if path is None:
+        grid = np.empty((rows, cols), dtype=np.uint8)
+    else:
+        grid = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(rows, cols))
+    for r0 in range(0, rows, max(1, chunk_rows)):
+        r1 = min(rows, r0 + max(1, chunk_rows))
+        block = np.empty((r1 - r0, cols), dtype=np.uint8)
+        for r in range(r0, r1):
+            rng = np.random.default_rng([seed, r])
+            block[r - r0] = rng.random(cols) < obstacle_prob
+        grid[r0:r1] = block
+    if path is not None:
+        grid.flush()
+    return grid
+
+
+def load_grid(path: str) -> np.ndarray:
+    # Opens a saved grid read-only without reading it into memory.
+    return np.load(path, mmap_mode="r")
+
+
 def neighbors(pos: Coord, grid: np.ndarray) -> List[Coord]:
     r, c = pos
     steps = [(-1, 0), (1, 0), (0, -1), (0, 1)]
@@ -32,7 +89,17 @@ def heuristic(a: Coord, b: Coord) -> float:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 
-def a_star(grid: np.ndarray, start: Coord, goal: Coord) -> Optional[List[Coord]]:
+def a_star(
+    grid: np.ndarray,
+    start: Coord,
+    goal: Coord,
+    method: str = "astar",
+    stats: Optional[SearchStats] = None,
+) -> Optional[List[Coord]]:
+    if method == "jps":
+        return jps(grid, start, goal, stats=stats)
+    if method != "astar":
+        raise ValueError(f"Unknown method: {method}")
     if grid[start] == 1 or grid[goal] == 1:
         return None
     open_set = []
@@ -41,6 +108,8 @@ def a_star(grid: np.ndarray, start: Coord, goal: Coord) -> Optional[List[Coord]]
     g_score = {start: 0}
     while open_set:
         _, cost, current = heapq.heappop(open_set)
+        if stats is not None:
+            stats.expansions += 1
         if current == goal:
             path = []
             while current is not None:
@@ -58,7 +127,473 @@ def a_star(grid: np.ndarray, start: Coord, goal: Coord) -> Optional[List[Coord]]
     return None
 
 
+class AnytimePlanner:
+    # Anytime Repairing A* (ARA*): weighted A* with a decreasing inflation
+    # factor that reuses its search effort between iterations. Each improve()
+    # call runs until the deadline and can be called again to keep refining.
+
+    def __init__(
+        self,
+        grid: np.ndarray,
+        start: Coord,
+        goal: Coord,
+        epsilon: float = 3.0,
+        epsilon_step: float = 0.5,
+    ) -> None:
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.epsilon = max(1.0, epsilon)
+        self.epsilon_step = epsilon_step
+        self.g: Dict[Coord, float] = {start: 0.0}
+        self.came_from: Dict[Coord, Optional[Coord]] = {start: None}
+        self.expansions = 0
+        self.elapsed = 0.0
+        self._open: Dict[Coord, float] = {start: self._f(start)}
+        self._heap: List[Tuple[float, float, Coord]] = [(self._open[start], 0.0, start)]
+        self._closed: set = set()
+        self._incons: set = set()
+        self._bound = math.inf
+        self._iteration_done = False
+        self._blocked = grid[start] == 1 or grid[goal] == 1
+
+    @property
+    def optimal(self) -> bool:
+        return self._iteration_done and self._bound <= 1.0
+
+    def improve(self, time_limit: Optional[float] = None) -> AnytimeResult:
+        t0 = time.perf_counter()
+        deadline = None if time_limit is None else t0 + time_limit
+        while not self._blocked:
+            if self._iteration_done:
+                # Done once the path is optimal, the goal proved unreachable or
+                # epsilon cannot shrink any further (epsilon_step=0 is plain
+                # weighted A* with a fixed bound).
+                next_epsilon = max(1.0, self.epsilon - self.epsilon_step)
+                if self._bound <= 1.0 or self.goal not in self.g or next_epsilon >= self.epsilon:
+                    break
+                self.epsilon = next_epsilon
+                for s in self._incons:
+                    self._open[s] = 0.0
+                self._incons.clear()
+                self._closed.clear()
+                self._open = {s: self._f(s) for s in self._open}
+                self._heap = [(f, -self.g[s], s) for s, f in self._open.items()]
+                heapq.heapify(self._heap)
+                self._iteration_done = False
+            if not self._improve_path(deadline):
+                break
+            self._iteration_done = True
+            self._bound = self._current_bound()
+        self.elapsed += time.perf_counter() - t0
+        return self.result()
+
+    def result(self) -> AnytimeResult:
+        cost = self.g.get(self.goal, math.inf)
+        path = None
+        if self._blocked:
+            cost = math.inf
+        elif cost < math.inf:
+            path = []
+            cur: Optional[Coord] = self.goal
+            while cur is not None:
+                path.append(cur)
+                cur = self.came_from[cur]
+            path.reverse()
+            cost = float(len(path) - 1)
+        return AnytimeResult(path, cost, self._bound, self.epsilon, self.expansions, self.elapsed)
+
+    def _f(self, s: Coord) -> float:
+        return self.g[s] + self.epsilon * heuristic(s, self.goal)
+
+    def _improve_path(self, deadline: Optional[float]) -> bool:
+        # Returns False if the deadline interrupted the iteration.
+        while self._heap:
+            f, _, s = self._heap[0]
+            if self._open.get(s) != f:
+                heapq.heappop(self._heap)
+                continue
+            if self.g.get(self.goal, math.inf) <= f:
+                return True
+            if deadline is not None and self.expansions % 256 == 0 and time.perf_counter() >= deadline:
+                return False
+            heapq.heappop(self._heap)
+            del self._open[s]
+            self._closed.add(s)
+            self.expansions += 1
+            tentative = self.g[s] + 1
+            for nb in neighbors(s, self.grid):
+                if tentative < self.g.get(nb, math.inf):
+                    self.g[nb] = tentative
+                    self.came_from[nb] = s
+                    if nb in self._closed:
+                        self._incons.add(nb)
+                    else:
+                        self._open[nb] = self._f(nb)
+                        heapq.heappush(self._heap, (self._open[nb], -tentative, nb))
+        return True
+
+    def _current_bound(self) -> float:
+        cost = self.g.get(self.goal, math.inf)
+        if cost == math.inf:
+            return math.inf
+        lower = min(
+            (self.g[s] + heuristic(s, self.goal) for s in list(self._open) + list(self._incons)),
+            default=cost,
+        )
+        if lower <= 0:
+            return self.epsilon
+        return max(1.0, min(self.epsilon, cost / lower))
+
+
+def anytime_a_star(
+    grid: np.ndarray,
+    start: Coord,
+    goal: Coord,
+    time_limit: Optional[float] = None,
+    epsilon: float = 3.0,
+    epsilon_step: float = 0.5,
+) -> AnytimeResult:
+    return AnytimePlanner(grid, start, goal, epsilon, epsilon_step).improve(time_limit)
+
+
+def octile(a: Coord, b: Coord) -> float:
+    dr, dc = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return max(dr, dc) + (SQRT2 - 1.0) * min(dr, dc)
+
+
+def _sign(v: int) -> int:
+    return int(v > 0) - int(v < 0)
+
+
+def jps(
+    grid: np.ndarray,
+    start: Coord,
+    goal: Coord,
+    diagonal: bool = False,
+    stats: Optional[SearchStats] = None,
+) -> Optional[List[Coord]]:
+    # Jump Point Search for uniform-cost grids. diagonal=False uses the same
+    # 4-connected moves as a_star(); diagonal=True allows 8-connected moves
+    # costing sqrt(2) that never cut corners.
+    padded = np.zeros((grid.shape[0] + 2, grid.shape[1] + 2), dtype=bool)
+    padded[1:-1, 1:-1] = grid == 0
+    free = padded.tolist()
+    walkable: Callable[[int, int], bool] = lambda r, c: free[r + 1][c + 1]
+
+    if not walkable(*start) or not walkable(*goal):
+        return None
+
+    h = octile if diagonal else heuristic
+    successors_of = _jps_successors_8 if diagonal else _jps_successors_4
+    g_score: Dict[Coord, float] = {start: 0.0}
+    came_from: Dict[Coord, Optional[Coord]] = {start: None}
+    open_set: List[Tuple[float, Coord]] = [(h(start, goal), start)]
+    closed = set()
+    while open_set:
+        _, current = heapq.heappop(open_set)
+        if current in closed:
+            continue
+        closed.add(current)
+        if stats is not None:
+            stats.expansions += 1
+        if current == goal:
+            jump_points = []
+            while current is not None:
+                jump_points.append(current)
+                current = came_from[current]
+            jump_points.reverse()
+            return _expand_jump_points(jump_points)
+        for jp in successors_of(current, came_from[current], goal, walkable):
+            if jp in closed:
+                continue
+            tentative = g_score[current] + h(current, jp)
+            if tentative < g_score.get(jp, float("inf")):
+                g_score[jp] = tentative
+                came_from[jp] = current
+                heapq.heappush(open_set, (tentative + h(jp, goal), jp))
+    return None
+
+
+def _expand_jump_points(jump_points: List[Coord]) -> List[Coord]:
+    path = [jump_points[0]]
+    for (r1, c1) in jump_points[1:]:
+        r, c = path[-1]
+        dr, dc = _sign(r1 - r), _sign(c1 - c)
+        while (r, c) != (r1, c1):
+            r, c = r + dr, c + dc
+            path.append((r, c))
+    return path
+
+
+def _jps_successors_4(
+    node: Coord, parent: Optional[Coord], goal: Coord, walkable: Callable[[int, int], bool]
+) -> List[Coord]:
+    r, c = node
+    if parent is None:
+        dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    else:
+        dr, dc = _sign(r - parent[0]), _sign(c - parent[1])
+        if dr != 0:
+            dirs = [(dr, 0), (0, 1), (0, -1)]
+        else:
+            dirs = [(0, dc), (1, 0), (-1, 0)]
+    result = []
+    for dr, dc in dirs:
+        if walkable(r + dr, c + dc):
+            jp = _jps_jump_4(r + dr, c + dc, dr, dc, goal, walkable)
+            if jp is not None:
+                result.append(jp)
+    return result
+
+
+def _jps_jump_4(
+    r: int, c: int, dr: int, dc: int, goal: Coord, walkable: Callable[[int, int], bool]
+) -> Optional[Coord]:
+    # Canonical order: column runs may branch along rows at any cell,
+    # row runs only stop at forced neighbours or the goal.
+    while walkable(r, c):
+        if (r, c) == goal:
+            return (r, c)
+        if dr != 0:
+            if (walkable(r, c - 1) and not walkable(r - dr, c - 1)) or (
+                walkable(r, c + 1) and not walkable(r - dr, c + 1)
+            ):
+                return (r, c)
+        else:
+            if (walkable(r - 1, c) and not walkable(r - 1, c - dc)) or (
+                walkable(r + 1, c) and not walkable(r + 1, c - dc)
+            ):
+                return (r, c)
+            for sr in (1, -1):
+                if _jps_jump_4(r + sr, c, sr, 0, goal, walkable) is not None:
+                    return (r, c)
+        r, c = r + dr, c + dc
+    return None
+
+
+def _jps_successors_8(
+    node: Coord, parent: Optional[Coord], goal: Coord, walkable: Callable[[int, int], bool]
+) -> List[Coord]:
+    r, c = node
+    dirs = []
+    if parent is None:
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                if (dr or dc) and walkable(r + dr, c + dc) and (
+                    dr == 0 or dc == 0 or (walkable(r + dr, c) and walkable(r, c + dc))
+                ):
+                    dirs.append((dr, dc))
+    else:
+        dr, dc = _sign(r - parent[0]), _sign(c - parent[1])
+        if dr != 0 and dc != 0:
+            if walkable(r, c + dc):
+                dirs.append((0, dc))
+            if walkable(r + dr, c):
+                dirs.append((dr, 0))
+            if walkable(r, c + dc) and walkable(r + dr, c):
+                dirs.append((dr, dc))
+        elif dr != 0:
+            right, left = walkable(r, c + 1), walkable(r, c - 1)
+            if walkable(r + dr, c):
+                dirs.append((dr, 0))
+                if right:
+                    dirs.append((dr, 1))
+                if left:
+                    dirs.append((dr, -1))
+            if right:
+                dirs.append((0, 1))
+            if left:
+                dirs.append((0, -1))
+        else:
+            down, up = walkable(r + 1, c), walkable(r - 1, c)
+            if walkable(r, c + dc):
+                dirs.append((0, dc))
+                if down:
+                    dirs.append((1, dc))
+                if up:
+                    dirs.append((-1, dc))
+            if down:
+                dirs.append((1, 0))
+            if up:
+                dirs.append((-1, 0))
+    result = []
+    for dr, dc in dirs:
+        jp = _jps_jump_8(r + dr, c + dc, dr, dc, goal, walkable)
+        if jp is not None:
+            result.append(jp)
+    return result
+
+
+def _jps_jump_8(
+    r: int, c: int, dr: int, dc: int, goal: Coord, walkable: Callable[[int, int], bool]
+) -> Optional[Coord]:
+    while walkable(r, c):
+        if (r, c) == goal:
+            return (r, c)
+        if dr != 0 and dc != 0:
+            if _jps_jump_8(r + dr, c, dr, 0, goal, walkable) is not None or _jps_jump_8(
+                r, c + dc, 0, dc, goal, walkable
+            ) is not None:
+                return (r, c)
+        elif dr != 0:
+            if (walkable(r, c - 1) and not walkable(r - dr, c - 1)) or (
+                walkable(r, c + 1) and not walkable(r - dr, c + 1)
+            ):
+                return (r, c)
+        else:
+            if (walkable(r - 1, c) and not walkable(r - 1, c - dc)) or (
+                walkable(r + 1, c) and not walkable(r + 1, c - dc)
+            ):
+                return (r, c)
+        if not (walkable(r + dr, c) and walkable(r, c + dc)):
+            return None
+        r, c = r + dr, c + dc
+    return None
+
+
+def distance_field(grid: np.ndarray, goal: Coord) -> Tuple[np.ndarray, np.ndarray]:
+    # Breadth-first wavefront from the goal over free cells, one NumPy pass per
+    # distance level. dist is -1 where the goal is unreachable; next_step holds
+    # the flat (row-major) index of the neighbour one step closer to the goal.
+    # Works on generate_grid() output and on GridWorld.to_numpy() (as (y, x)).
+    rows, cols = grid.shape
+    free = (np.asarray(grid) == 0).ravel()
+    dist = np.full(rows * cols, -1, dtype=np.int32)
+    next_step = np.full(rows * cols, -1, dtype=np.int64)
+    if not free[goal[0] * cols + goal[1]]:
+        return dist.reshape(rows, cols), next_step.reshape(rows, cols)
+
+    frontier = np.array([goal[0] * cols + goal[1]], dtype=np.int64)
+    dist[frontier] = 0
+    next_step[frontier] = frontier
+    level = 0
+    while frontier.size:
+        level += 1
+        col = frontier % cols
+        candidates = []
+        sources = []
+        for offset, ok in (
+            (-cols, frontier >= cols),
+            (cols, frontier < (rows - 1) * cols),
+            (-1, col > 0),
+            (1, col < cols - 1),
+        ):
+            src = frontier[ok]
+            candidates.append(src + offset)
+            sources.append(src)
+        nb = np.concatenate(candidates)
+        src = np.concatenate(sources)
+        keep = free[nb] & (dist[nb] < 0)
+        nb, first = np.unique(nb[keep], return_index=True)
+        dist[nb] = level
+        next_step[nb] = src[keep][first]
+        frontier = nb
+    return dist.reshape(rows, cols), next_step.reshape(rows, cols)
+
+
+def path_from_field(dist: np.ndarray, next_step: np.ndarray, start: Coord) -> Optional[List[Coord]]:
+    cols = dist.shape[1]
+    if dist[start] < 0:
+        return None
+    flat_next = next_step.ravel()
+    cur = start[0] * cols + start[1]
+    path = [start]
+    while True:
+        nxt = int(flat_next[cur])
+        if nxt == cur:
+            return path
+        cur = nxt
+        path.append(divmod(cur, cols))
+
+
+class DistanceFieldCache:
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._fields: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+    @staticmethod
+    def key(grid: np.ndarray, goal: Coord) -> tuple:
+        data = np.ascontiguousarray(grid)
+        digest = hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest()
+        return (digest, data.shape, data.dtype.str, (int(goal[0]), int(goal[1])))
+
+    def get(self, grid: np.ndarray, goal: Coord) -> Tuple[np.ndarray, np.ndarray]:
+        k = self.key(grid, goal)
+        field = self._fields.get(k)
+        if field is not None:
+            self.hits += 1
+            self._fields.move_to_end(k)
+            return field
+        self.misses += 1
+        field = distance_field(grid, goal)
+        self._fields[k] = field
+        if len(self._fields) > self.maxsize:
+            self._fields.popitem(last=False)
+        return field
+
+    def path(self, grid: np.ndarray, start: Coord, goal: Coord) -> Optional[List[Coord]]:
+        if grid[start] != 0:
+            return None
+        dist, next_step = self.get(grid, goal)
+        return path_from_field(dist, next_step, start)
+
+    def clear(self) -> None:
+        self._fields.clear()
+
+
+_FIELD_CACHE = DistanceFieldCache()
+
+
+def shortest_path_to_goal(
+    grid: np.ndarray, start: Coord, goal: Coord, cache: Optional[DistanceFieldCache] = None
+) -> Optional[List[Coord]]:
+    return (cache or _FIELD_CACHE).path(grid, start, goal)
+
+
+# Palette indexed by the cell labels used in render_grid_path.
+GRID_COLORS = np.array(
+    [
+        [255, 255, 255],  # free
+        [0, 0, 0],  # obstacle
+        [220, 30, 30],  # path
+        [0, 160, 0],  # start
+        [30, 60, 220],  # goal
+    ],
+    dtype=np.uint8,
+)
+
+
+def render_grid_path(
+    grid: np.ndarray,
+    path: Optional[List[Coord]],
+    start: Coord,
+    goal: Coord,
+    scale: Optional[int] = None,
+    max_size: int = 600,
+) -> np.ndarray:
+    # Draws straight into a uint8 RGB image; each cell becomes a scale x scale
+    # block (nearest neighbour). By default the longer side fits max_size.
+    rows, cols = grid.shape
+    if scale is None:
+        scale = max(1, max_size // max(rows, cols))
+    labels = (grid != 0).astype(np.uint8)
+    if path:
+        rs, cs = np.asarray(path, dtype=np.int64).T
+        labels[rs, cs] = 2
+    labels[start] = 3
+    labels[goal] = 4
+    if scale > 1:
+        labels = labels.repeat(scale, axis=0).repeat(scale, axis=1)
+    return GRID_COLORS[labels]
+
+
 def visualize_grid_path(grid: np.ndarray, path: Optional[List[Coord]], start: Coord, goal: Coord):
+    # Matplotlib figure with legend; much slower than render_grid_path.
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(6, 6))
     ax.imshow(grid, cmap="gray_r")
     ax.scatter([start[1]], [start[0]], c="green", s=80, label="Start")
@@ -1,11 +1,10 @@
 import json
 import numpy as np
 import streamlit as st
-from PIL import Image
 
 from modules.ml import train_iris_model, get_iris_data, predict_iris
-from modules.cv import preprocess_image, canny_edges
-from modules.robotics import generate_grid, a_star, visualize_grid_path
+from modules.cv import CVPipeline, preprocess_image, canny_edges
+from modules.robotics import generate_grid, a_star, render_grid_path, visualize_grid_path
 from modules.security import (
     hash_password,
     verify_password,
@@ -33,7 +32,7 @@ def page_ml():
         model, metrics = train_iris_model(model_name, test_size, int(random_state))
         st.session_state["ml_model"] = model
         st.session_state["ml_metrics"] = metrics
-        st.success(f"Trained {model_name}")
+        st.success(f"{'Loaded cached' if metrics['cached'] else 'Trained'} {model_name}")
 
     if "ml_metrics" in st.session_state:
         metrics = st.session_state["ml_metrics"]
@@ -77,10 +76,24 @@ def page_cv():
     high = st.slider("Canny high", 0, 255, 200, 5)
 
     if uploaded is not None:
-        img = Image.open(uploaded)
-        proc = preprocess_image(img, width=width, height=height, blur_ksize=blur, grayscale=False)
+        # Kept across reruns so a slider change only recomputes later stages.
+        if "cv_pipeline" not in st.session_state:
+            st.session_state["cv_pipeline"] = CVPipeline()
+        pipeline = st.session_state["cv_pipeline"]
+        # Large photos are decoded only as big as the requested size, rounded
+        # up to a power of two so small slider moves keep the cached decode.
+        side = 1 << (max(width, height) - 1).bit_length()
+        pipeline.set_decode_size((side, side))
+        data = uploaded.getvalue()
+        proc = preprocess_image(data, width=width, height=height, blur_ksize=blur, grayscale=False, pipeline=pipeline)
         edges = canny_edges(
-            img, width=width, height=height, blur_ksize=blur, low_threshold=low, high_threshold=high
+            data,
+            width=width,
+            height=height,
+            blur_ksize=blur,
+            low_threshold=low,
+            high_threshold=high,
+            pipeline=pipeline,
         )
         c1, c2 = st.columns(2)
         with c1:
@@ -118,8 +131,13 @@ def page_robotics():
     start = (int(start_r), int(start_c))
     goal = (int(goal_r), int(goal_c))
     path = a_star(grid, start, goal)
-    fig = visualize_grid_path(grid, path, start, goal)
-    st.pyplot(fig, use_container_width=True)
+    pretty = st.checkbox("Pretty plot (matplotlib, slower)", value=False)
+    if pretty:
+        fig = visualize_grid_path(grid, path, start, goal)
+        st.pyplot(fig, use_container_width=True)
+    else:
+        st.caption("Green=start, Blue=goal, Red=path")
+        st.image(render_grid_path(grid, path, start, goal), use_column_width=True)
 
     if path:
         st.success(f"Path length: {len(path) - 1} steps")
@@ -0,0 +1,51 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from modules.cv import CVPipeline, load_image, preprocess_image
+
+
+def _encode(img: Image.Image) -> bytes:
+    # PNG stores mode I as I;16, so 32-bit images go through TIFF.
+    buf = io.BytesIO()
+    img.save(buf, format="TIFF" if img.mode == "I" else "PNG")
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize(
+    "mode, fill, expected",
+    [
+        ("P", 3, (30, 60, 90)),  # palette entry 3 set below
+        ("1", 1, (255, 255, 255)),
+        ("I", 200, (200, 200, 200)),
+        ("I;16", 120, (120, 120, 120)),
+        ("L", 77, (77, 77, 77)),
+    ],
+)
+def test_load_image_reduces_every_mode(mode, fill, expected):
+    img = Image.new(mode, (2048, 2048), fill)
+    if mode == "P":
+        img.putpalette([0, 0, 0] * 3 + [30, 60, 90] + [0, 0, 0] * 252)
+    data = _encode(img)
+    assert Image.open(io.BytesIO(data)).mode == mode
+
+    small = load_image(data, min_size=(256, 256))
+    assert small.size == (512, 512)
+    assert tuple(np.array(small.convert("RGB"))[0, 0]) == expected
+
+    pipeline = CVPipeline(decode_size=(256, 256))
+    out = preprocess_image(data, width=256, height=256, blur_ksize=3, grayscale=False, pipeline=pipeline)
+    assert out.shape == (256, 256, 3)
+    assert tuple(out[128, 128]) == expected
+
+
+def test_pipeline_redecodes_when_decode_size_changes():
+    buf = io.BytesIO()
+    Image.new("RGB", (2400, 1600), (10, 20, 30)).save(buf, format="JPEG")
+    pipeline = CVPipeline(decode_size=(256, 256))
+    pipeline.set_source(buf.getvalue())
+    small = pipeline.decoded().size
+    pipeline.set_decode_size((1024, 1024))
+    assert pipeline.decoded().size[0] > small[0] >= 512
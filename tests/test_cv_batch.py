@@ -0,0 +1,61 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from modules.cv_batch import main, make_processor, process_directory
+
+
+def _write_images(directory, n):
+    rng = np.random.default_rng(0)
+    images = {}
+    for i in range(n):
+        img = rng.integers(0, 256, (40 + i, 60, 3), dtype=np.uint8)
+        sub = os.path.join(directory, "sub" if i % 2 else "")
+        os.makedirs(sub, exist_ok=True)
+        path = os.path.join(sub, f"img{i}.png")
+        cv2.imwrite(path, img)
+        images[os.path.relpath(path, directory)] = img
+    return images
+
+
+def test_process_directory_writes_every_image(tmp_path):
+    src, dst = str(tmp_path / "in"), str(tmp_path / "out")
+    images = _write_images(src, 6)
+    process = make_processor("gray", width=32, height=24)
+    stats = process_directory(src, dst, process, fmt="png", workers=3, queue_size=2)
+    assert stats.images == 6 and stats.failed == 0
+    for rel, img in images.items():
+        out = cv2.imread(os.path.join(dst, rel), cv2.IMREAD_UNCHANGED)
+        assert np.array_equal(out, process(img))
+
+
+def test_bad_files_are_counted_and_fail_the_cli(tmp_path, capsys):
+    src, dst = str(tmp_path / "in"), str(tmp_path / "out")
+    _write_images(src, 2)
+    with open(os.path.join(src, "corrupt.png"), "wb") as f:
+        f.write(b"not an image")
+    os.symlink(str(tmp_path / "missing.png"), os.path.join(src, "dangling.png"))
+
+    stats = process_directory(src, dst, workers=2)
+    assert stats.images == 2 and stats.failed == 2
+
+    with pytest.raises(SystemExit) as exc:
+        main([src, dst, "--workers", "2"])
+    assert exc.value.code == 1
+    assert "2 images (2 failed)" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("args", [["--workers", "0"], ["--format", "xyz"]])
+def test_cli_rejects_bad_arguments(tmp_path, args):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path), str(tmp_path / "out")] + args)
+    assert exc.value.code == 2
+
+
+def test_process_directory_rejects_bad_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        process_directory(str(tmp_path), str(tmp_path / "out"), workers=0)
+    with pytest.raises(ValueError):
+        process_directory(str(tmp_path), str(tmp_path / "out"), fmt="xyz")
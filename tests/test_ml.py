@@ -0,0 +1,77 @@
+import asyncio
+
+import joblib
+import numpy as np
+
+from modules import ml
+from modules.ml import MicroBatcher, ModelRegistry, get_iris_data, predict_batch, train_iris_model
+
+
+def test_registry_falls_back_to_memory_when_disk_is_unwritable(tmp_path, monkeypatch):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert ModelRegistry(str(blocker / "registry")).directory is None
+
+    def refuse(*args, **kwargs):
+        raise PermissionError("read-only")
+
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    monkeypatch.setattr(joblib, "dump", refuse)
+    model, metrics = train_iris_model(registry=registry)
+    assert not metrics["cached"]
+    assert list((tmp_path / "registry").iterdir()) == []
+    cached, metrics = train_iris_model(registry=registry)
+    assert metrics["cached"] and cached is model
+
+
+def test_registry_key_includes_sklearn_version(monkeypatch):
+    key = ModelRegistry.key("Random Forest", None, 0.2, 42, "data")
+    monkeypatch.setattr(ml.sklearn, "__version__", "0.0")
+    assert ModelRegistry.key("Random Forest", None, 0.2, 42, "data") != key
+
+
+MODEL, _ = train_iris_model(use_cache=False)
+X, _, _, _ = get_iris_data()
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    async def main():
+        async with MicroBatcher(MODEL, max_batch_size=16, max_latency=0.05) as batcher:
+            results = await asyncio.gather(*(batcher.predict(row) for row in X[:40]))
+            return results, batcher.stats()
+
+    results, stats = asyncio.run(main())
+    labels, proba = predict_batch(MODEL, X[:40])
+    assert [r[0] for r in results] == labels.tolist()
+    assert all(abs(r[1][c] - p) < 1e-12 for r, row in zip(results, proba) for c, p in enumerate(row))
+    assert stats["requests"] == 40
+    assert stats["max_batch_size"] == 16 and stats["batches"] == 3
+
+
+def test_micro_batcher_rejects_bad_rows_without_failing_the_batch():
+    async def main():
+        async with MicroBatcher(MODEL, max_latency=0.05) as batcher:
+            return await asyncio.gather(
+                batcher.predict(X[0]),
+                batcher.predict([1.0, 2.0, 3.0]),
+                batcher.predict([np.nan] * 4),
+                batcher.predict(X[60]),
+                return_exceptions=True,
+            )
+
+    good, short, nan, other = asyncio.run(main())
+    assert good[0] == 0 and other[0] == 1
+    assert isinstance(short, ValueError) and isinstance(nan, ValueError)
+
+
+def test_micro_batcher_close_fails_pending_requests():
+    async def main():
+        batcher = MicroBatcher(MODEL, max_batch_size=64, max_latency=10.0)
+        batcher.start()
+        tasks = [asyncio.ensure_future(batcher.predict(row)) for row in X[:3]]
+        await asyncio.sleep(0.01)  # the worker is now waiting to fill the batch
+        await batcher.close()
+        return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1.0)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
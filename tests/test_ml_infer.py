@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from modules.ml import _logistic_uses_ovr, build_model, build_streaming_model, export_numpy, get_iris_data
+from modules.ml_infer import NumpyPredictor
+
+X, y, _, target_names = get_iris_data()
+# The training rows plus noisy copies, so many forest thresholds are crossed.
+X_EVAL = np.vstack([X, X + np.random.default_rng(0).normal(scale=0.3, size=X.shape)])
+BINARY = (y == 1).astype(int)
+
+
+@pytest.mark.parametrize(
+    "make, labels, kind",
+    [
+        (lambda: build_model("Logistic Regression"), y, "softmax"),
+        (lambda: build_model("Logistic Regression"), BINARY, "ovr"),
+        (lambda: build_streaming_model("Logistic Regression"), y, "ovr"),
+        (lambda: build_streaming_model("Logistic Regression"), BINARY, "ovr"),
+        (lambda: build_model("Random Forest", {"n_estimators": 25}), y, "forest"),
+        (lambda: build_model("Random Forest", {"n_estimators": 25, "max_depth": 3}), BINARY, "forest"),
+        (lambda: build_model("Random Forest", {"n_estimators": 25}), target_names[y], "forest"),
+        (lambda: build_model("Logistic Regression"), target_names[y], "softmax"),
+    ],
+)
+def test_numpy_predictor_matches_sklearn(tmp_path, make, labels, kind):
+    model = make().fit(X, labels)
+    path = str(tmp_path / "model.npz")
+    export_numpy(model, path)
+    predictor = NumpyPredictor.load(path)
+    assert predictor.kind == kind
+    np.testing.assert_allclose(predictor.predict_proba(X_EVAL), model.predict_proba(X_EVAL), rtol=0, atol=1e-12)
+    assert np.array_equal(predictor.predict(X_EVAL), model.predict(X_EVAL))
+    labels_out, proba = predictor.predict_batch(X_EVAL[0])
+    assert labels_out[0] == model.predict(X_EVAL[:1])[0] and proba.shape == (1, len(model.classes_))
+
+
+@pytest.mark.parametrize(
+    "multi_class, solver, n_classes, ovr",
+    [
+        (None, "lbfgs", 3, False),  # releases without multi_class
+        (None, "lbfgs", 2, True),
+        ("auto", "lbfgs", 3, False),
+        ("auto", "lbfgs", 2, True),
+        ("auto", "liblinear", 3, True),
+        ("deprecated", "liblinear", 3, True),
+        ("ovr", "lbfgs", 2, True),
+        ("ovr", "lbfgs", 3, True),
+        ("multinomial", "lbfgs", 2, False),
+        ("multinomial", "lbfgs", 3, False),
+    ],
+)
+def test_logistic_ovr_rule_follows_sklearn(multi_class, solver, n_classes, ovr):
+    # scikit-learn 1.3's LogisticRegression.predict_proba rule.
+    clf = LogisticRegression()
+    clf.classes_ = np.arange(n_classes)
+    clf.solver = solver
+    if multi_class is None:
+        if hasattr(clf, "multi_class"):
+            del clf.multi_class
+    else:
+        clf.multi_class = multi_class
+    assert _logistic_uses_ovr(clf) is ovr
+
+
+def test_binary_multinomial_export_uses_symmetric_softmax(tmp_path):
+    # sklearn 1.3 computes softmax([-z, z]) for a binary multinomial model.
+    model = build_model("Logistic Regression").fit(X, BINARY)
+    model[-1].multi_class = "multinomial"
+    path = str(tmp_path / "model.npz")
+    export_numpy(model, path)
+    z = model.decision_function(X_EVAL)
+    expected = np.exp(np.c_[-z, z])
+    expected /= expected.sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(NumpyPredictor.load(path).predict_proba(X_EVAL), expected, rtol=0, atol=1e-12)
@@ -0,0 +1,101 @@
+import numpy as np
+
+from modules.robotics import (
+    AnytimePlanner,
+    DistanceFieldCache,
+    a_star,
+    anytime_a_star,
+    distance_field,
+    generate_grid,
+    path_from_field,
+)
+
+
+def _cases(n=8, size=40):
+    rng = np.random.default_rng(11)
+    for seed in range(n):
+        grid = generate_grid(size, size, obstacle_prob=0.25, seed=seed)
+        free = np.argwhere(grid == 0)
+        while True:
+            s, g = (tuple(int(v) for v in free[i]) for i in rng.choice(len(free), 2, replace=False))
+            path = a_star(grid, s, g)
+            if path and len(path) > size // 2:
+                yield grid, s, g, len(path) - 1
+                break
+
+
+def test_anytime_reaches_the_optimal_cost():
+    for grid, s, g, optimal in _cases():
+        result = anytime_a_star(grid, s, g, epsilon=3.0)
+        assert result.cost == optimal
+        assert result.path[0] == s and result.path[-1] == g
+        assert result.bound == 1.0 and result.epsilon == 1.0
+
+
+def test_weighted_search_respects_epsilon_bound():
+    for grid, s, g, optimal in _cases():
+        for epsilon in (1.5, 2.0, 3.0):
+            # epsilon_step=0 stops after the first, inflated search.
+            result = AnytimePlanner(grid, s, g, epsilon=epsilon, epsilon_step=0.0).improve()
+            assert optimal <= result.cost <= epsilon * optimal
+            assert result.cost <= result.bound * optimal + 1e-9
+            assert result.bound <= epsilon
+
+
+def test_deadline_then_resume_improves_to_optimal():
+    for grid, s, g, optimal in _cases(n=4, size=80):
+        planner = AnytimePlanner(grid, s, g, epsilon=3.0, epsilon_step=0.5)
+        first = planner.improve(time_limit=0.0)
+        assert first.path is None or first.cost <= first.bound * optimal + 1e-9
+
+        costs, epsilons = [], []
+        for _ in range(10_000):
+            result = planner.improve(time_limit=1e-3)
+            if result.path is not None:
+                assert result.cost <= result.bound * optimal + 1e-9
+                costs.append(result.cost)
+                epsilons.append(result.epsilon)
+            if planner.optimal:
+                break
+        assert planner.optimal and costs[-1] == optimal
+        assert costs == sorted(costs, reverse=True)
+        assert epsilons == sorted(epsilons, reverse=True) and epsilons[-1] == 1.0
+
+
+def test_distance_field_matches_a_star():
+    rng = np.random.default_rng(3)
+    for seed in range(5):
+        grid = generate_grid(30, 25, obstacle_prob=0.3, seed=seed)
+        free = [tuple(int(v) for v in c) for c in np.argwhere(grid == 0)]
+        goal = free[int(rng.integers(len(free)))]
+        dist, next_step = distance_field(grid, goal)
+        for i in rng.choice(len(free), 40, replace=False):
+            start = free[i]
+            expected = a_star(grid, start, goal)
+            path = path_from_field(dist, next_step, start)
+            if expected is None:
+                assert dist[start] == -1 and path is None
+                continue
+            assert dist[start] == len(expected) - 1 == len(path) - 1
+            assert path[0] == start and path[-1] == goal
+            for a, b in zip(path, path[1:]):
+                assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and grid[b] == 0
+        assert (dist[grid == 1] == -1).all()
+
+
+def test_distance_field_cache_invalidates_on_grid_change():
+    grid = np.zeros((5, 7), dtype=np.uint8)
+    cache = DistanceFieldCache(maxsize=4)
+    assert len(cache.path(grid, (2, 0), (2, 6))) == 7
+    assert len(cache.path(grid, (0, 0), (2, 6))) == 9
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    grid[1:, 3] = 1  # wall with a gap in row 0
+    path = cache.path(grid, (2, 0), (2, 6))
+    assert cache.misses == 2
+    assert len(path) == len(a_star(grid, (2, 0), (2, 6))) == 11
+    assert all(grid[c] == 0 for c in path)
+
+    grid[0, 3] = 1  # goal now unreachable
+    assert cache.path(grid, (2, 0), (2, 6)) is None
+    assert cache.misses == 3